@@ -2,30 +2,68 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from typing import Any
 
 from attr import dataclass
 from bleak.exc import BleakError
+import voluptuous as vol
 
 from homeassistant.components import bluetooth
 from homeassistant.components.bluetooth.match import ADDRESS, BluetoothCallbackMatcher
-from .coordinator import BedCoordinator
+from .coordinator import (
+    BedCoordinator,
+    async_take_over_bed,
+    position_store,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    ATTR_DEVICE_ID,
     ATTR_NAME,
     CONF_ADDRESS,
     EVENT_HOMEASSISTANT_STOP,
     Platform,
 )
-from homeassistant.core import Event, HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
 from homeassistant.helpers.device_registry import DeviceInfo
-
-from .const import DOMAIN
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    ATTR_FOOT,
+    ATTR_HEAD,
+    CONF_PREWARM,
+    DOMAIN,
+    SERVICE_GROUP_MOVE,
+)
+from .lib.connection_manager import PRIORITY_COMMAND
 
 PLATFORMS: list[Platform] = [Platform.COVER, Platform.BUTTON]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+_POSITION = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))
+GROUP_MOVE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_HEAD): _POSITION,
+            vol.Optional(ATTR_FOOT): _POSITION,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_HEAD, ATTR_FOOT),
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -38,11 +76,113 @@ class BedData:
     coordinator: BedCoordinator
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services shared by all beds."""
+
+    async def _async_group_move(call: ServiceCall) -> ServiceResponse:
+        return await async_group_move(
+            hass,
+            _beds_for_devices(hass, call.data[ATTR_DEVICE_ID]),
+            call.data.get(ATTR_HEAD),
+            call.data.get(ATTR_FOOT),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GROUP_MOVE,
+        _async_group_move,
+        schema=GROUP_MOVE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
+def _beds_for_devices(hass: HomeAssistant, device_ids: list[str]) -> list[BedData]:
+    """Resolve device ids to the loaded beds they belong to."""
+    registry = dr.async_get(hass)
+    loaded: dict[str, BedData] = hass.data.get(DOMAIN, {})
+    beds: list[BedData] = []
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        data = next(
+            (
+                loaded[entry_id]
+                for entry_id in (device.config_entries if device else ())
+                if entry_id in loaded
+            ),
+            None,
+        )
+        if data is None:
+            raise ServiceValidationError(f"{device_id} is not a loaded Linak bed")
+        if data not in beds:
+            beds.append(data)
+    return beds
+
+
+async def async_group_move(
+    hass: HomeAssistant,
+    beds: list[BedData],
+    head: int | None,
+    foot: int | None,
+) -> dict[str, Any]:
+    """Move several beds to the same positions at the same time.
+
+    Every bed connects in parallel, then all of them wait on a barrier so the
+    moves start together. The call takes as long as the slowest bed.
+    """
+    if not beds:
+        raise ServiceValidationError("No beds to move")
+    barrier = asyncio.Barrier(len(beds))
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(_async_group_move_bed(data, head, foot, barrier) for data in beds)
+    )
+    return {
+        "seconds": round(time.monotonic() - started, 2),
+        "beds": list(results),
+    }
+
+
+async def _async_group_move_bed(
+    data: BedData, head: int | None, foot: int | None, barrier: asyncio.Barrier
+) -> dict[str, Any]:
+    coordinator = data.coordinator
+    result: dict[str, Any] = {"name": coordinator.name, "address": data.mac_address}
+    try:
+        try:
+            connected = await coordinator.async_connect(PRIORITY_COMMAND)
+        finally:
+            # Beds that failed still arrive, so the others are not held back
+            await barrier.wait()
+        if not connected:
+            raise BleakError("No connection")
+        moving = time.monotonic()
+        await coordinator.bed.move_to_reference(head=head, foot=foot)
+    except Exception as ex:  # noqa: BLE001
+        _LOGGER.warning("Group move failed for %s: %s", data.mac_address, ex)
+        result.update(success=False, error=str(ex))
+        return result
+    result.update(
+        success=True,
+        seconds=round(time.monotonic() - moving, 2),
+        head=coordinator.bed.head_position,
+        foot=coordinator.bed.feet_position,
+    )
+    return result
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up IKEA Idasen from a config entry."""
     address: str = entry.data[CONF_ADDRESS].upper()
 
-    coordinator = BedCoordinator(hass, _LOGGER, entry.title, address)
+    coordinator = BedCoordinator(
+        hass,
+        _LOGGER,
+        entry.title,
+        address,
+        await async_take_over_bed(hass, address, entry.title),
+        entry,
+    )
     device_info = DeviceInfo(
         name=entry.title,
         connections={(dr.CONNECTION_BLUETOOTH, address)},
@@ -50,34 +190,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = BedData(
         address, device_info, coordinator
     )
-
-    try:
-        if not await coordinator.async_connect():
-            raise ConfigEntryNotReady(
-                f"Unable to connect to bed {address} - No connection"
-            )  # noqa: TRY301
-    except (TimeoutError, BleakError, Exception) as ex:
-        _LOGGER.warning("Unable to connect to bed {address}", ex)
-        raise ConfigEntryNotReady(f"Unable to connect to bed {address} - Error") from ex
+    # Entities start from the restored positions and the first command
+    # connects, so setup never waits for a bed that is out of range
+    await coordinator.async_restore()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
+    if entry.options.get(CONF_PREWARM, False):
+        entry.async_create_background_task(
+            hass, coordinator.async_connect(), f"{address} pre-warm connect"
+        )
+
     @callback
     def _async_bluetooth_callback(
         service_info: bluetooth.BluetoothServiceInfoBleak,
         change: bluetooth.BluetoothChange,
     ) -> None:
         """Update from a Bluetooth callback to ensure that a new BLEDevice is fetched."""
-        _LOGGER.debug("Bluetooth callback triggered")
-        hass.async_create_task(coordinator.async_connect_if_expected())
+        coordinator.async_handle_advertisement(service_info)
 
     entry.async_on_unload(
         bluetooth.async_register_callback(
             hass,
             _async_bluetooth_callback,
             BluetoothCallbackMatcher({ADDRESS: address}),
-            bluetooth.BluetoothScanningMode.ACTIVE,
+            bluetooth.BluetoothScanningMode.PASSIVE,
         )
     )
 
@@ -96,6 +234,8 @@ async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> Non
     data: BedData = hass.data[DOMAIN][entry.entry_id]
     if entry.title != data.device_info[ATTR_NAME]:
         await hass.config_entries.async_reload(entry.entry_id)
+        return
+    data.coordinator.apply_options(entry.options)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -106,3 +246,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         bluetooth.async_rediscover_address(hass, data.address)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored positions of a deleted bed."""
+    await position_store(hass, entry.entry_id).async_remove()
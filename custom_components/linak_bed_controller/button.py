@@ -7,12 +7,14 @@ from bleak.exc import BleakError
 from .const import DOMAIN
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.exceptions import HomeAssistantError
 
 from . import BedCoordinator, BedData
+from .lib.bed import CalibrationError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +31,12 @@ CONSUMABLE_BUTTON_DESCRIPTIONS = [
         name="Set Flat",
         command="set_flat",
     ),
+    LinakBedButtonDescription(
+        key="calibrate",
+        name="Calibrate",
+        command="calibrate",
+        entity_category=EntityCategory.CONFIG,
+    ),
 ]
 
 
@@ -40,7 +48,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up the cover platform for the bed."""
     data: BedData = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([BedFlatButton( data.coordinator, CONSUMABLE_BUTTON_DESCRIPTIONS[0])])
+    async_add_entities(
+        [
+            BedFlatButton(data.coordinator, CONSUMABLE_BUTTON_DESCRIPTIONS[0]),
+            BedCalibrateButton(data.coordinator, CONSUMABLE_BUTTON_DESCRIPTIONS[1]),
+        ]
+    )
 
 
 class BedFlatButton(CoordinatorEntity[BedCoordinator], ButtonEntity):
@@ -62,7 +75,7 @@ class BedFlatButton(CoordinatorEntity[BedCoordinator], ButtonEntity):
     async def async_press(self) -> None:
         """Triggers the IdasenDesk button press service."""
         try:
-            await self._bed.set_flat()
+            await self._bed.move_to(head=0, foot=0)
         except BleakError as err:
             raise HomeAssistantError("Failed to stop moving: Bluetooth error") from err
 
@@ -70,3 +83,32 @@ class BedFlatButton(CoordinatorEntity[BedCoordinator], ButtonEntity):
     def available(self) -> bool:
         """Connect/disconnect buttons should always be available."""
         return True
+
+
+class BedCalibrateButton(CoordinatorEntity[BedCoordinator], ButtonEntity):
+    """Defines a button that measures the stroke times of the bed."""
+
+    entity_description: LinakBedButtonDescription
+
+    def __init__(
+        self,
+        coordinator: BedCoordinator,
+        entity_description: LinakBedButtonDescription,
+    ) -> None:
+        """Initialize the calibrate button entity."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+
+    async def async_press(self) -> None:
+        """Run the calibration and store the result."""
+        try:
+            await self.coordinator.async_calibrate()
+        except CalibrationError as err:
+            raise HomeAssistantError(f"Failed to calibrate: {err}") from err
+        except BleakError as err:
+            raise HomeAssistantError("Failed to calibrate: Bluetooth error") from err
+
+    @property
+    def available(self) -> bool:
+        """Calibration connects on demand, so it is always available."""
+        return True
@@ -3,20 +3,40 @@
 from __future__ import annotations
 
 import logging
+import re
 from typing import Any
 
+from bleak.exc import BleakError
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_ADDRESS, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_CAPABILITIES,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEP_CONNECTED,
+    CONF_PREWARM,
+    DOMAIN,
+)
+from .coordinator import async_create_bed, async_hand_over_bed
+from .lib.connection_manager import PRIORITY_COMMAND
+from .lib.const import IDLE_DISCONNECT_TIMEOUT
+from .lib.gatt import ControlService
 
 _LOGGER = logging.getLogger(__name__)
 
-# TODO adjust the data schema to the data that you need
+_ADDRESS = re.compile(r"^([0-9A-F]{2}:){5}[0-9A-F]{2}$")
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_NAME): str,
@@ -24,28 +44,46 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
-
-class PlaceholderHub:
-    """Placeholder class to make tests pass.
-
-    TODO Remove this placeholder class and replace with things from your PyPI package.
-    """
-
-    def __init__(self, host: str) -> None:
-        """Initialize."""
-        self.host = host
-
-    async def authenticate(self, username: str, password: str) -> bool:
-        """Test if we can authenticate with the host."""
-        return True
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_IDLE_TIMEOUT, default=IDLE_DISCONNECT_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=3600)
+        ),
+        vol.Optional(CONF_KEEP_CONNECTED, default=False): bool,
+        vol.Optional(CONF_PREWARM, default=False): bool,
+    }
+)
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
-    Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    Connects once and probes the capability record. The connected bed is
+    handed over to the entry, so the first move after setup needs no connect.
     """
-    return {"title": data[CONF_NAME]}
+    address = data[CONF_ADDRESS]
+    ble_device = bluetooth.async_ble_device_from_address(
+        hass, address, connectable=True
+    )
+    if ble_device is None:
+        raise CannotConnect
+    bed = await async_create_bed(hass, address, data[CONF_NAME])
+    try:
+        await bed.set_ble_device(ble_device, PRIORITY_COMMAND)
+        if not bed.ready.is_set():
+            raise CannotConnect
+        await bed.get_capabilities()
+    except (BleakError, TimeoutError) as ex:
+        await bed.async_cleanup()
+        raise CannotConnect from ex
+    except Exception:
+        await bed.async_cleanup()
+        raise
+    async_hand_over_bed(hass, bed)
+    entry_data = {CONF_NAME: data[CONF_NAME], CONF_ADDRESS: address}
+    if bed.capabilities is not None:
+        entry_data[CONF_CAPABILITIES] = bed.capabilities.as_dict()
+    return {"title": data[CONF_NAME], "data": entry_data}
 
 
 class ConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -53,32 +91,154 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovery_info: BluetoothServiceInfoBleak | None = None
+        self._discovered: dict[str, BluetoothServiceInfoBleak] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
+    @callback
+    def _configured_addresses(self) -> set[str]:
+        # Entries created before discovery existed have no unique id
+        return {
+            entry.data[CONF_ADDRESS].upper()
+            for entry in self._async_current_entries(include_ignore=False)
+        }
+
+    async def _async_create_bed(
+        self, user_input: dict[str, Any], errors: dict[str, str]
+    ) -> ConfigFlowResult | None:
+        """Connect once and create the entry, or fill in errors."""
+        address = user_input[CONF_ADDRESS].strip().upper()
+        if not _ADDRESS.match(address):
+            errors[CONF_ADDRESS] = "invalid_address"
+            return None
+        # Checked before connecting, so a connected bed is never left behind
+        await self.async_set_unique_id(address)
+        self._abort_if_unique_id_configured()
+        try:
+            info = await validate_input(
+                self.hass, {**user_input, CONF_ADDRESS: address}
+            )
+        except CannotConnect:
+            errors["base"] = "cannot_connect"
+        except Exception:
+            _LOGGER.exception("Unexpected exception")
+            errors["base"] = "unknown"
+        else:
+            return self.async_create_entry(title=info["title"], data=info["data"])
+        return None
+
+    async def async_step_bluetooth(
+        self, discovery_info: BluetoothServiceInfoBleak
+    ) -> ConfigFlowResult:
+        """Handle a bed found through its control service advertisement."""
+        address = discovery_info.address.upper()
+        await self.async_set_unique_id(address)
+        self._abort_if_unique_id_configured()
+        if address in self._configured_addresses():
+            return self.async_abort(reason="already_configured")
+        self._discovery_info = discovery_info
+        self.context["title_placeholders"] = {
+            "name": discovery_info.name or address
+        }
+        return await self.async_step_bluetooth_confirm()
+
+    async def async_step_bluetooth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Confirm a discovered bed, connecting once before the entry is created."""
+        assert self._discovery_info is not None
+        info = self._discovery_info
+        name = info.name or info.address
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if result := await self._async_create_bed(
+                {CONF_NAME: name, CONF_ADDRESS: info.address},
+                errors,
+            ):
+                return result
+
+        self._set_confirm_only()
+        return self.async_show_form(
+            step_id="bluetooth_confirm",
+            description_placeholders={"name": name, "source": info.source},
+            errors=errors,
+        )
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
-        """Handle the initial step."""
+        """Pick a discovered bed, strongest signal first, or enter an address."""
         errors: dict[str, str] = {}
         if user_input is not None:
-            try:
-                info = await validate_input(self.hass, user_input)
-            except CannotConnect:
-                errors["base"] = "cannot_connect"
-            except InvalidAuth:
-                errors["base"] = "invalid_auth"
-            except Exception:
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
-            else:
-                return self.async_create_entry(title=info["title"], data=user_input)
+            info = self._discovered.get(user_input[CONF_ADDRESS])
+            user_input = {
+                CONF_NAME: user_input.get(CONF_NAME)
+                or (info.name if info is not None else None)
+                or user_input[CONF_ADDRESS],
+                CONF_ADDRESS: user_input[CONF_ADDRESS],
+            }
+            if result := await self._async_create_bed(user_input, errors):
+                return result
+
+        configured = self._configured_addresses()
+        self._discovered = {
+            info.address: info
+            for info in sorted(
+                bluetooth.async_discovered_service_info(self.hass, connectable=True),
+                key=lambda info: info.rssi,
+                reverse=True,
+            )
+            if ControlService.uuid in info.service_uuids
+            and info.address.upper() not in configured
+        }
+        if not self._discovered:
+            return self.async_show_form(
+                step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            )
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ADDRESS): vol.In(
+                        {
+                            address: (
+                                f"{info.name or address} ({address}), "
+                                f"{info.rssi} dBm via {info.source}"
+                            )
+                            for address, info in self._discovered.items()
+                        }
+                    ),
+                    vol.Optional(CONF_NAME): str,
+                }
+            ),
+            errors=errors,
+        )
+
+
+class OptionsFlowHandler(OptionsFlow):
+    """Handle the connection options of a bed."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage how long the bed stays connected after use."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
         )
 
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
-
-
-class InvalidAuth(HomeAssistantError):
-    """Error to indicate there is invalid auth."""
@@ -1,13 +1,29 @@
-"""Constants for the Linak Bed Controller integration."""
+"""Constants for the Linak Bed Controller integration.
+
+Constants of the bed protocol and motion live in ``lib/const.py``.
+"""
 
 DOMAIN = "linak_bed_controller"
+DATA_CONNECTION_MANAGER = f"{DOMAIN}_connection_manager"
+DATA_HANDOVER = f"{DOMAIN}_handover"
+DATA_PACING = f"{DOMAIN}_pacing"
+DATA_PROXY_ROUTER = f"{DOMAIN}_proxy_router"
+
+CONF_CALIBRATION = "calibration"
+CONF_CAPABILITIES = "capabilities"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_KEEP_CONNECTED = "keep_connected"
+CONF_PREWARM = "prewarm"
+
+SERVICE_GROUP_MOVE = "group_move"
+ATTR_HEAD = "head"
+ATTR_FOOT = "foot"
 
-# Connection configuration optimized for ESP32 Bluetooth proxies
-CONNECTION_TIMEOUT = 10  # seconds
-CONNECTION_RETRY_DELAY = 2  # seconds (reduced from 5)
-MAX_CONNECTION_ATTEMPTS = 3  # reduced from 6
-GATT_AUTH_TIMEOUT = 3  # seconds (reduced from 10)
-POST_CONNECTION_DELAY = 0.3  # seconds (reduced from 1.5)
+# Last known positions are written behind, once movement has settled
+STORAGE_VERSION = 1
+POSITION_SAVE_DELAY = 10  # seconds
+PACING_SAVE_DELAY = 30  # seconds
+PROXY_ROUTER_SAVE_DELAY = 30  # seconds
 
-# ESP32 Bluetooth proxy optimizations
-ESP32_MTU_SIZE = 185  # Optimal MTU for ESP32
+# Advertisements only trigger a reconnect this often, and never while connected
+ADVERTISEMENT_RECONNECT_INTERVAL = 30  # seconds
@@ -2,16 +2,125 @@
 
 from __future__ import annotations
 
+import asyncio
+from functools import partial
 import logging
+import time
+from typing import Any, Mapping
 
 from homeassistant.components import bluetooth
+from .const import (
+    ADVERTISEMENT_RECONNECT_INTERVAL,
+    CONF_CALIBRATION,
+    CONF_CAPABILITIES,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEP_CONNECTED,
+    DATA_CONNECTION_MANAGER,
+    DATA_HANDOVER,
+    DATA_PACING,
+    DATA_PROXY_ROUTER,
+    DOMAIN,
+    PACING_SAVE_DELAY,
+    POSITION_SAVE_DELAY,
+    PROXY_ROUTER_SAVE_DELAY,
+    STORAGE_VERSION,
+)
 from .lib.bed import Bed
-from homeassistant.core import HomeAssistant
+from .lib.capabilities import Capabilities
+from .lib.connection_manager import PRIORITY_BACKGROUND, ConnectionManager
+from .lib.connection_policy import STATE_OPEN, ConnectionPolicy
+from .lib.const import IDLE_DISCONNECT_TIMEOUT
+from .lib.pacing import PacingTable
+from .lib.proxy_router import ProxyRouter, RoutePath
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def position_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, float]]:
+    """Return the store holding the last known positions of a bed."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+@callback
+def async_get_connection_manager(hass: HomeAssistant) -> ConnectionManager:
+    """Return the manager all beds share, so they share proxy connection slots."""
+    return hass.data.setdefault(DATA_CONNECTION_MANAGER, ConnectionManager())
+
+
+async def async_get_pacing_table(hass: HomeAssistant) -> PacingTable:
+    """Return the learned command pacing shared by all beds, loading it once."""
+    if (table := hass.data.get(DATA_PACING)) is not None:
+        return table
+    store: Store[dict[str, float]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.pacing")
+    table = hass.data[DATA_PACING] = PacingTable()
+    table.load(await store.async_load() or {})
+    table.on_change = lambda: store.async_delay_save(table.as_dict, PACING_SAVE_DELAY)
+    return table
+
+
+async def async_get_proxy_router(hass: HomeAssistant) -> ProxyRouter:
+    """Return the connect history of every bed and proxy, loading it once."""
+    if (router := hass.data.get(DATA_PROXY_ROUTER)) is not None:
+        return router
+    store: Store[dict[str, dict[str, Any]]] = Store(
+        hass, STORAGE_VERSION, f"{DOMAIN}.proxy_router"
+    )
+    router = hass.data[DATA_PROXY_ROUTER] = ProxyRouter()
+    router.load(await store.async_load() or {})
+    router.on_change = lambda: store.async_delay_save(
+        router.as_dict, PROXY_ROUTER_SAVE_DELAY
+    )
+    return router
+
+
+@callback
+def async_route_paths(hass: HomeAssistant, address: str) -> list[RoutePath]:
+    """Return every adapter and proxy that currently hears the bed."""
+    return [
+        RoutePath(device.scanner.source, device.advertisement.rssi, device.ble_device)
+        for device in bluetooth.async_scanner_devices_by_address(
+            hass, address, connectable=True
+        )
+    ]
+
+
+async def async_create_bed(hass: HomeAssistant, address: str, name: str) -> Bed:
+    """Create a Bed reached through the Bluetooth integration and shared history."""
+    return Bed(
+        address,
+        name,
+        _LOGGER,
+        partial(bluetooth.async_ble_device_from_address, hass, connectable=True),
+        connection_manager=async_get_connection_manager(hass),
+        pacing_table=await async_get_pacing_table(hass),
+        connection_policy=ConnectionPolicy(logger=_LOGGER),
+        route_lookup=partial(async_route_paths, hass),
+        proxy_router=await async_get_proxy_router(hass),
+    )
+
+
+@callback
+def async_hand_over_bed(hass: HomeAssistant, bed: Bed) -> None:
+    """Keep a bed the config flow connected for the entry it is creating.
+
+    A bed that is never taken over drops its connection once the idle timeout
+    passes, as after any command.
+    """
+    hass.data.setdefault(DATA_HANDOVER, {})[bed.mac_address.upper()] = bed
+
+
+async def async_take_over_bed(hass: HomeAssistant, address: str, name: str) -> Bed:
+    """Return the bed the config flow left connected, or a new one."""
+    if (bed := hass.data.get(DATA_HANDOVER, {}).pop(address.upper(), None)) is None:
+        return await async_create_bed(hass, address, name)
+    bed.device_name = name
+    return bed
+
+
 class BedCoordinator(DataUpdateCoordinator[int | None]):
     """Class to manage updates for the Bed."""
 
@@ -21,28 +130,70 @@ class BedCoordinator(DataUpdateCoordinator[int | None]):
         logger: logging.Logger,
         name: str,
         address: str,
+        bed: Bed,
+        entry: ConfigEntry | None = None,
     ) -> None:
         """Init BedCoordinator."""
 
         super().__init__(hass, logger, name=name)
         self._address = address
         self._expected_connected = False
+        self._reconnect_task: asyncio.Task | None = None
+        self._last_reconnect = -ADVERTISEMENT_RECONNECT_INTERVAL
+        self._entry = entry
+        self.bed = bed
+        self.connection_policy = bed.connection_policy
+        if entry is not None:
+            self.apply_options(entry.options)
+        self._store: Store[dict[str, float]] | None = None
+        if entry is not None:
+            self.bed.set_calibration(entry.data.get(CONF_CALIBRATION))
+            if self.bed.capabilities is None:
+                # A bed taken over from the config flow has probed already
+                self.bed.set_capabilities(entry.data.get(CONF_CAPABILITIES))
+            self.bed.on_capabilities = self._async_capabilities_probed
+            self._store = position_store(hass, entry.entry_id)
+        self.bed.add_listener(self._async_position_changed)
+
+    @callback
+    def apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the idle disconnect policy from the entry options."""
+        self.bed.set_idle_policy(
+            options.get(CONF_IDLE_TIMEOUT, IDLE_DISCONNECT_TIMEOUT),
+            options.get(CONF_KEEP_CONNECTED, False),
+        )
+
+    async def async_restore(self) -> None:
+        """Restore the last known positions before entities are added."""
+        if self._store is None or not (data := await self._store.async_load()):
+            return
+        _LOGGER.debug("Restoring positions for %s: %s", self._address, data)
+        self.bed.head_position = data.get("head_position", 0)
+        self.bed.feet_position = data.get("feet_position", 0)
+
+    @callback
+    def _async_position_changed(self) -> None:
+        """Refresh entities and schedule a single write once movement settles."""
+        if self._store is not None:
+            self._store.async_delay_save(self._positions_to_store, POSITION_SAVE_DELAY)
+        self.async_update_listeners()
 
-        self.bed = Bed(self._address, name, _LOGGER, hass)
+    def _positions_to_store(self) -> dict[str, float]:
+        return {
+            "head_position": self.bed.head_position,
+            "feet_position": self.bed.feet_position,
+        }
 
-    async def async_connect(self) -> bool:
+    async def async_connect(self, priority: int = PRIORITY_BACKGROUND) -> bool:
         """Connect to bed."""
         _LOGGER.info("Attempting to connect to bed: %s", self._address)
         self._expected_connected = True
         
         # Get fresh BLE device from Home Assistant's Bluetooth integration
-        if self.bed.client is not None and self.bed.client.is_connected:
+        if self.bed.ready.is_set():
             _LOGGER.debug("Already connected to bed, skipping connection...")
             return True
 
-        elif self.bed.client is not None and not self.bed.client.is_connected:
-            _LOGGER.debug("Not connected to bed, attempting to connect...")
-
         ble_device = bluetooth.async_ble_device_from_address(
             self.hass, self._address, connectable=True
         )
@@ -53,7 +204,12 @@ class BedCoordinator(DataUpdateCoordinator[int | None]):
         _LOGGER.debug("BLE device found, initiating connection...")
         
         try:
-            await self.bed.set_ble_device(ble_device)
+            if self.bed.client is not None:
+                _LOGGER.debug("Not connected to bed, reconnecting existing client...")
+                self.bed.update_ble_device(ble_device)
+                await self.bed.connect(priority)
+            else:
+                await self.bed.set_ble_device(ble_device, priority)
             _LOGGER.info("Successfully connected to bed: %s", self._address)
             return True
         except Exception as ex:
@@ -71,3 +227,53 @@ class BedCoordinator(DataUpdateCoordinator[int | None]):
         """Ensure that the desk is connected if that is the expected state."""
         if self._expected_connected:
             await self.async_connect()
+
+    @callback
+    def async_handle_advertisement(
+        self, service_info: bluetooth.BluetoothServiceInfoBleak
+    ) -> None:
+        """Follow advertisements without a reconnect per advertisement.
+
+        The BLEDevice is only replaced when the bed is heard through another
+        adapter or proxy. Reconnects are single-flight, rate limited and never
+        attempted while connected. Only a bed kept connected is reconnected;
+        any other one dropped its connection on purpose, when idle or evicted
+        for another bed, and connects again on its next command.
+        """
+        if self.bed.update_ble_device(service_info.device, service_info.source):
+            _LOGGER.debug(
+                "%s is now reachable through %s", self._address, service_info.source
+            )
+        if not (self._expected_connected and self.bed.keep_connected):
+            return
+        if self.bed.is_connected:
+            return
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            return
+        if self.connection_policy.state == STATE_OPEN:
+            return
+        now = time.monotonic()
+        if now - self._last_reconnect < ADVERTISEMENT_RECONNECT_INTERVAL:
+            return
+        self._last_reconnect = now
+        self._reconnect_task = self.hass.async_create_background_task(
+            self.async_connect(), f"{self._address} advertisement reconnect"
+        )
+
+    @callback
+    def _async_capabilities_probed(self, capabilities: Capabilities) -> None:
+        """Keep the probed record so the next start only checks the identity."""
+        if self._entry is not None:
+            self.hass.config_entries.async_update_entry(
+                self._entry,
+                data={**self._entry.data, CONF_CAPABILITIES: capabilities.as_dict()},
+            )
+
+    async def async_calibrate(self) -> None:
+        """Measure the stroke times of the bed and store them in the entry."""
+        calibration = await self.bed.calibrate()
+        if self._entry is not None:
+            self.hass.config_entries.async_update_entry(
+                self._entry,
+                data={**self._entry.data, CONF_CALIBRATION: calibration},
+            )
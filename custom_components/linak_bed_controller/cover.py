@@ -22,6 +22,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import BedCoordinator, BedData
 from .const import DOMAIN
+from .lib.actuator import Actuator
 
 
 async def async_setup_entry(
@@ -39,6 +40,19 @@ async def async_setup_entry(
     )
 
 
+def rest_attributes(coordinator: BedCoordinator, actuator: Actuator) -> dict[str, Any]:
+    """State attributes shared by both rests; the counters live in diagnostics."""
+    bed = coordinator.bed
+    return {
+        "coalesced_targets": actuator.mailbox.total_coalesced,
+        "commands_saved": actuator.mailbox.total_commands_saved,
+        "command_interval": bed.pacing.interval,
+        "connected": bed.is_connected,
+        "connection_state": coordinator.connection_policy.state,
+        "connection_path": bed.connection_source,
+    }
+
+
 class BedHeadRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     """Representation of Bed device."""
 
@@ -80,7 +94,7 @@ class BedHeadRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover."""
         try:
-            await self._bed.set_flat_head()
+            await self._bed.move_to(head=0)
             self._update_state(CoverState.CLOSED)
         except BleakError as err:
             raise HomeAssistantError("Failed to move down: Bluetooth error") from err
@@ -88,7 +102,7 @@ class BedHeadRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
         try:
-            await self._bed.set_max_head()
+            await self._bed.move_to(head=100)
             self._update_state(CoverState.OPEN)
         except BleakError as err:
             raise HomeAssistantError("Failed to move up: Bluetooth error") from err
@@ -121,7 +135,7 @@ class BedHeadRest(CoordinatorEntity[BedCoordinator], CoverEntity):
                 if position_percentage <= 100
                 else CoverState.OPEN
             )
-            await self._bed.move_head_rest_to(position_percentage)
+            await self._bed.move_to(head=position_percentage)
 
             self._attr_current_cover_position = position_percentage
             self.async_write_ha_state()
@@ -141,6 +155,11 @@ class BedHeadRest(CoordinatorEntity[BedCoordinator], CoverEntity):
         """Position of the cover."""
         return int(self._bed.head_position)
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return slider coalescing savings, command pacing and connection state."""
+        return rest_attributes(self.coordinator, self._bed.head)
+
 
 class BedFootRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     """Representation of Bed device."""
@@ -195,7 +214,7 @@ class BedFootRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close the cover."""
         try:
-            await self._bed.set_flat_foot()
+            await self._bed.move_to(foot=0)
             self._update_state(CoverState.CLOSED)
         except BleakError as err:
             raise HomeAssistantError("Failed to move down: Bluetooth error") from err
@@ -203,7 +222,7 @@ class BedFootRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
         try:
-            await self._bed.set_max_foot()
+            await self._bed.move_to(foot=100)
             self._update_state(CoverState.OPEN)
         except BleakError as err:
             raise HomeAssistantError("Failed to move up: Bluetooth error") from err
@@ -224,7 +243,7 @@ class BedFootRest(CoordinatorEntity[BedCoordinator], CoverEntity):
                 if position_percentage <= 100
                 else CoverState.OPEN
             )
-            await self._bed.move_foot_rest_to(position_percentage)
+            await self._bed.move_to(foot=position_percentage)
             self._attr_current_cover_position = position_percentage
             self.async_write_ha_state()
         except BleakError as err:
@@ -241,4 +260,9 @@ class BedFootRest(CoordinatorEntity[BedCoordinator], CoverEntity):
     @property
     def current_cover_position(self) -> int | None:
         """Position of the cover."""
-        return int(self._bed.head_position)
\ No newline at end of file
+        return int(self._bed.feet_position)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return slider coalescing savings, command pacing and connection state."""
+        return rest_attributes(self.coordinator, self._bed.foot)
@@ -0,0 +1,31 @@
+"""Diagnostics support for the Linak Bed Controller integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import BedData
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the connection counters and the paths the bed is reached through."""
+    data: BedData = hass.data[DOMAIN][entry.entry_id]
+    bed = data.coordinator.bed
+    return {
+        "connected": bed.is_connected,
+        "connection_path": bed.connection_source,
+        "connection_failovers": bed.failovers,
+        "connects_avoided": bed.connects_avoided,
+        "connects_forced": bed.connects_forced,
+        "connects_shared": bed.connects_shared,
+        "idle_disconnects": bed.idle_disconnects,
+        "connection_policy": bed.connection_policy.as_dict(),
+        "connection_paths": bed.describe_routes(),
+        "capabilities": bed.capabilities.as_dict() if bed.capabilities else None,
+    }
@@ -0,0 +1,118 @@
+"""Command line interface for the bed library.
+
+Run from ``custom_components/linak_bed_controller`` so ``lib`` imports as a
+standalone package, without Home Assistant::
+
+    python -m lib scan
+    python -m lib move C8:6D:2A:94:05:92 --head 40 --foot 0
+    python -m lib move --simulator --head 100
+    python -m lib bench head stop --link-interval 0.05
+
+``move`` and ``scan`` use the local Bluetooth adapter through bleak unless
+``--simulator`` is given. ``bench`` takes the arguments of ``lib.bench``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+
+_LOGGER = logging.getLogger(__package__)
+
+
+async def _scan(args: argparse.Namespace) -> int:
+    if args.simulator:
+        from .simulator import SimulatedBedDevice
+
+        device = SimulatedBedDevice()
+        devices = [(device, device.rssi)]
+    else:
+        from bleak import BleakScanner
+
+        from .gatt import ControlService
+
+        found = await BleakScanner.discover(
+            timeout=args.timeout,
+            service_uuids=[ControlService.uuid],
+            return_adv=True,
+        )
+        devices = [(device, adv.rssi) for device, adv in found.values()]
+    for device, rssi in sorted(devices, key=lambda item: -item[1]):
+        print(f"{device.address}  {rssi:>4} dBm  {device.name or 'Unknown'}")
+    return 0
+
+
+async def _move(args: argparse.Namespace) -> int:
+    if args.head is None and args.foot is None:
+        print("move: give --head and/or --foot", file=sys.stderr)
+        return 2
+    if args.simulator:
+        from .bench import make_bed
+        from .simulator import SimulatedBedDevice
+
+        bed = await make_bed(SimulatedBedDevice(address=args.address))
+    else:
+        from bleak import BleakScanner
+
+        from .bed import Bed
+
+        device = await BleakScanner.find_device_by_address(
+            args.address, timeout=args.timeout
+        )
+        if device is None:
+            print(f"move: {args.address} not found", file=sys.stderr)
+            return 1
+        bed = Bed(args.address, device.name or args.address, _LOGGER)
+        await bed.set_ble_device(device)
+    try:
+        if args.reference:
+            await bed.move_to_reference(args.head, args.foot)
+        else:
+            await bed.move_to(args.head, args.foot)
+        print(f"head {bed.head_position:.1f}  foot {bed.feet_position:.1f}")
+    finally:
+        await bed.async_cleanup()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m lib", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="list nearby Linak beds")
+    scan.add_argument("--timeout", type=float, default=10.0)
+    scan.add_argument("--simulator", action="store_true")
+
+    move = commands.add_parser("move", help="move a bed to a position")
+    move.add_argument("address", nargs="?", default="00:00:00:00:00:00")
+    move.add_argument("--head", type=float)
+    move.add_argument("--foot", type=float)
+    move.add_argument(
+        "--reference", action="store_true", help="use ReferenceInput targets"
+    )
+    move.add_argument("--timeout", type=float, default=10.0)
+    move.add_argument("--simulator", action="store_true")
+
+    commands.add_parser(
+        "bench", help="run the simulator benchmarks", add_help=False
+    )
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "bench":
+        from .bench import main as bench_main
+
+        bench_main(rest)
+        return 0
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    return asyncio.run(_scan(args) if args.command == "scan" else _move(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
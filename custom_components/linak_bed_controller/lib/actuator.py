@@ -0,0 +1,115 @@
+"""Command frames and position feedback for a single bed actuator."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from .const import (
+    COMMAND_DEBOUNCE,
+    MOTION_COMMAND_INTERVAL,
+    MOTION_KEEPALIVE_INTERVAL,
+    POSITION_TOLERANCE,
+    REFERENCE_POSITION_MAX,
+    STALL_TIMEOUT,
+)
+from .gatt import Characteristic, ReferenceOutputService
+from .mailbox import TargetMailbox
+
+_POSITION_UNKNOWN = 0xFFFF
+
+
+class Actuator:
+    """Track where one actuator is and how to move it."""
+
+    def __init__(
+        self,
+        name: str,
+        up: bytes,
+        down: bytes,
+        reference_output: type[Characteristic],
+        reference_input: type[Characteristic],
+        stroke_time: float,
+    ) -> None:
+        self.name = name
+        self.up = bytes(up)
+        self.down = bytes(down)
+        self.reference_output = reference_output
+        self.reference_input = reference_input
+        # Full stroke time per direction, measured by calibration
+        self.stroke_times = {1: stroke_time, -1: stroke_time}
+        self.calibrated = False
+
+        self.position: float = 0
+        self.velocity: int = 0  # raw units per second, as reported
+        self.measured = False
+        self.last_change = 0.0
+
+        self.mailbox = TargetMailbox(COMMAND_DEBOUNCE)
+        self.active = False  # A move loop owns the actuator
+        self.commands_sent = 0
+        self.on_change: Callable[[], None] | None = None
+
+    def command(self, direction: int) -> bytes:
+        return self.up if direction > 0 else self.down
+
+    @property
+    def interval(self) -> float:
+        """Command cadence; calibrated moves only need to keep the motor alive."""
+        return MOTION_KEEPALIVE_INTERVAL if self.calibrated else MOTION_COMMAND_INTERVAL
+
+    @property
+    def commands_per_percent(self) -> float:
+        """Streamed commands needed for one percent of travel."""
+        return 1 / (self.speed(1) * self.interval)
+
+    def speed(self, direction: int) -> float:
+        """Percent of travel per second."""
+        return 100 / self.stroke_times[direction]
+
+    def set_calibration(self, up: float, down: float) -> None:
+        self.stroke_times = {1: up, -1: down}
+        self.calibrated = True
+
+    def eta(self, target: float, direction: int) -> float:
+        """Seconds until the target is reached at full speed."""
+        return max(0, (target - self.position) * direction) / self.speed(direction)
+
+    def direction_to(self, target: float) -> int:
+        """1 or -1 to travel towards target, 0 if already there."""
+        if abs(target - self.position) <= POSITION_TOLERANCE:
+            return 0
+        return 1 if target > self.position else -1
+
+    def reached(self, target: float, direction: int) -> bool:
+        return (target - self.position) * direction <= POSITION_TOLERANCE
+
+    def estimate(self, start: float, direction: int, elapsed: float) -> None:
+        """Dead reckon the position when there is no ReferenceOutput feedback."""
+        if not self.measured:
+            position = start + direction * self.speed(direction) * elapsed
+            self.position = round(min(100, max(0, position)), 2)
+
+    @staticmethod
+    def to_raw(position: float) -> int:
+        """Convert a percentage to a ReferenceInput/Output position."""
+        return round(min(100, max(0, position)) * REFERENCE_POSITION_MAX / 100)
+
+    def stalled(self, now: float | None = None) -> bool:
+        """Return True if feedback shows no movement for STALL_TIMEOUT."""
+        now = time.monotonic() if now is None else now
+        return self.measured and now - self.last_change > STALL_TIMEOUT
+
+    def handle_reference_output(self, sender, data: bytearray) -> None:
+        """Notification callback for the ReferenceOutput characteristic."""
+        raw, self.velocity = ReferenceOutputService.decode_position_speed(data)
+        if raw == _POSITION_UNKNOWN:
+            return
+        position = round(min(100, 100 * raw / REFERENCE_POSITION_MAX), 2)
+        changed = position != self.position
+        if changed or not self.measured:
+            self.last_change = time.monotonic()
+        self.position = position
+        self.measured = True
+        if changed and self.on_change is not None:
+            self.on_change()
@@ -1,110 +1,336 @@
 """High level helper class to organise methods for performing actions with a Linak Bed."""
 
+from __future__ import annotations
+
 import asyncio
-from enum import Enum
+import dataclasses
+from functools import partial
 import logging
-import threading
 import time
+from typing import TYPE_CHECKING, Any, Callable
 
-from bleak import BleakClient
-from bleak.exc import BleakError, BleakDBusError
-from bleak_retry_connector import establish_connection, BleakClientWithServiceCache
-from bleak.backends.service import BleakGATTServiceCollection
-from homeassistant.components import bluetooth
+from bleak.exc import BleakError
 
-from homeassistant.helpers.entity_platform import Logger
-from ..const import (
+from .const import (
+    CALIBRATION_MAX_STROKE,
+    CALIBRATION_MIN_STROKE,
+    CONNECTION_DEADLINE,
     CONNECTION_TIMEOUT,
-    CONNECTION_RETRY_DELAY,
-    MAX_CONNECTION_ATTEMPTS,
     GATT_AUTH_TIMEOUT,
+    IDLE_DISCONNECT_TIMEOUT,
     POST_CONNECTION_DELAY,
     ESP32_MTU_SIZE,
+    MOTION_COMMAND_INTERVAL,
+    MOTION_MAX_IN_FLIGHT,
+    HEAD_STROKE_TIME,
+    FOOT_STROKE_TIME,
+    POSITION_TOLERANCE,
+    REFERENCE_MOVE_MARGIN,
+    STALL_TIMEOUT,
+    REVERSAL_DWELL,
+)
+from .actuator import Actuator
+from .connection_manager import PRIORITY_COMMAND, ConnectionManager
+from .connection_policy import ConnectionPolicy
+from .capabilities import Capabilities
+from . import codec
+from .codec import Command
+from .gatt import (
+    DPGService,
+    GenericAccessService,
+    GenericAccessServiceChangedCharacteristic,
+    ReferenceInputService,
+    ReferenceOutputService,
 )
+from .dpg import DPGChannel
+from .idle_timer import IdleTimer
+from .motion import MotionStream
+from .pacing import Pacing, PacingTable
+from .proxy_router import ProxyRouter, RoutePath
+from .util import NotificationBuffer
+from .writer import CommandWriter
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
+
+_LOGGER = logging.getLogger(__name__)
 
 _UUID_COMMAND: str = "99fa0002-338a-1024-8a49-009c0215f78a"
 
-_COMMAND_ALL_DOWN: bytearray = bytearray([0x00, 0x00])
-_COMMAND_ALL_UP: bytearray = bytearray([0x01, 0x00])
-_COMMAND_STOP_MOVEMENT: bytearray = bytearray([0xFF, 0x00])
 
-_COMMAND_HEAD_UP: bytearray = bytearray([0x0B, 0x00])
-_COMMAND_HEAD_DOWN: bytearray = bytearray([0x0A, 0x00])
-_COMMAND_FOOT_UP: bytearray = bytearray([0x09, 0x00])
-_COMMAND_FOOT_DOWN: bytearray = bytearray([0x08, 0x00])
-class Command(Enum):
-    """Enum for bed commands."""
+def _device_source(ble_device) -> str:
+    details = getattr(ble_device, "details", None)
+    if isinstance(details, dict):
+        if source := details.get("source"):
+            return source
+        if path := details.get("path"):
+            return path.split("/dev_")[0]
+    return "local"
+
+
+def _plausible_stroke(seconds: float | None) -> bool:
+    return (
+        seconds is not None
+        and CALIBRATION_MIN_STROKE <= seconds <= CALIBRATION_MAX_STROKE
+    )
+
 
-    ALL_DOWN = "0000"
-    ALL_UP = "0100"
-    STOP_MOVEMENT = "FF00"
-    HEAD_UP = "0B00"  # [0x0B, 0x00]
-    HEAD_DOWN = "0A00"  # [0x0A, 0x00]
-    FOOT_UP = "0900"  # [0x09, 0x00]
-    FOOT_DOWN = "0800"  # [0x08, 0x00]
+class CalibrationError(Exception):
+    """Raised when the stroke times of a bed cannot be measured."""
+
+
+class NotConnectedError(BleakError):
+    """Raised when a command cannot go out because the bed is not connected."""
 
 
 class Bed:
     client: BleakClient | None
     last_time_used: int = 0
     stop_actions: bool = False
-    _lock = asyncio.Lock()
-    _disconnect_task = None
-    hass = None
-
-    moving_foot_active: bool = False
-    moving_head_active: bool = False
-    moving_head_to_position: 0
-    moving_foot_to_position: 0
 
-
-    def __init__(self, mac_address: str, device_name: str, logger: Logger, hass):
+    def __init__(
+        self,
+        mac_address: str,
+        device_name: str,
+        logger: logging.Logger = _LOGGER,
+        ble_device_lookup: Callable[[str], Any] | None = None,
+        client_class=None,
+        connector=None,
+        connection_manager: ConnectionManager | None = None,
+        pacing_table: PacingTable | None = None,
+        connection_policy: ConnectionPolicy | None = None,
+        idle_timeout: float = IDLE_DISCONNECT_TIMEOUT,
+        keep_connected: bool = False,
+        route_lookup: Callable[[str], list[RoutePath]] | None = None,
+        proxy_router: ProxyRouter | None = None,
+    ):
         self.mac_address = mac_address
         self.device_name = device_name
-        self._disconnect_task = None
-        self.logger = logger  # logging.getLogger(__name__)
-        self.hass = hass
-        self.head_increment = (
-            100 / 130
-        )  # Number of commands required to go from 0% to 100%
-        self.feet_increment = 100 / 95
-
-        # "State" - assume bed is in flat position on boot
-        self.head_position = 0
-        self.feet_position = 0
+        self._lock = asyncio.Lock()
+        self._connecting: asyncio.Task | None = None
+        # Set while connected with services resolved and positions followed
+        self.ready = asyncio.Event()
+        self.connects_shared = 0
+        # Connects a warm connection made unnecessary, versus ones that had to
+        # be established
+        self.connects_avoided = 0
+        self.connects_forced = 0
+        self.idle_disconnects = 0
+        self.keep_connected = keep_connected
+        self._idle_timer = IdleTimer(idle_timeout, self._on_idle)
+        self._idle_disconnect: asyncio.Task | None = None
+        self.connection_manager = connection_manager
+        self.pacing_table = pacing_table
+        self.connection_policy = connection_policy or ConnectionPolicy(logger=logger)
+        self._pacing = Pacing()
+        self.logger = logger
+        # Finds the BLEDevice for an address, e.g. through Home Assistant's
+        # Bluetooth integration
+        self._ble_device_lookup = ble_device_lookup
+        # Lists every path the bed is heard through; with a router, each
+        # connect attempt takes the best path that has not failed yet
+        self._route_lookup = route_lookup
+        self.proxy_router = proxy_router
+        self._failed_sources: set[str] = set()
+        self.failovers = 0
+        # Injectable so the simulator can stand in for the radio; the real
+        # ones are imported on first use
+        self._client_class = client_class
+        self._connector = connector
+        # Positions come from ReferenceOutput notifications once connected,
+        # until then assume the bed is in flat position
+        self.head = Actuator(
+            "head",
+            Command.HEAD_UP,
+            Command.HEAD_DOWN,
+            ReferenceOutputService.ONE,
+            ReferenceInputService.ONE,
+            HEAD_STROKE_TIME,
+        )
+        self.foot = Actuator(
+            "foot",
+            Command.FOOT_UP,
+            Command.FOOT_DOWN,
+            ReferenceOutputService.TWO,
+            ReferenceInputService.TWO,
+            FOOT_STROKE_TIME,
+        )
         self.stop_actions = False
         self.light_status = False
         self.client = None
         self._ble_device = None  # Cache BLE device to avoid repeated lookups
+        # The adapter or proxy the device was heard through, as the route
+        # lookup names it; router history, pacing and slots are keyed on it
+        self._source: str | None = None
+        self._next_ble_device = None  # Another path, used after disconnecting
+        self._next_source: str | None = None
         self._services_discovered = False  # Track service discovery state
-    
+        self._cached_services = None  # Handed back to bleak on reconnect
+        self.capabilities: Capabilities | None = None
+        # A restored record is trusted once the bed reports the same identity
+        self._capabilities_verified = False
+        self._probe_lock = asyncio.Lock()
+        self.capability_probes = 0
+        self.on_capabilities: Callable[[Capabilities], None] | None = None
+        self._dpg: DPGChannel | None = None
+        self._writer: CommandWriter | None = None
+        self._streams: set[MotionStream] = set()
+        self._positions: list[tuple[NotificationBuffer, asyncio.Task]] = []
+        self._listeners: list[Callable[[], None]] = []
+        for actuator in self.actuators:
+            actuator.on_change = self._notify_listeners
+
+    @property
+    def actuators(self) -> tuple[Actuator, Actuator]:
+        return self.head, self.foot
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener whenever a position changes; returns a remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify_listeners(self):
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def moving_head_active(self) -> bool:
+        return self.head.active
+
+    @property
+    def moving_foot_active(self) -> bool:
+        return self.foot.active
+
+    @property
+    def moving_head_to_position(self) -> float | None:
+        return self.head.mailbox.target
+
+    @property
+    def moving_foot_to_position(self) -> float | None:
+        return self.foot.mailbox.target
+
+    @property
+    def is_idle(self) -> bool:
+        """Return True if nothing is moving and the connection may be dropped."""
+        return not (self._streams or self.moving_head_active or self.moving_foot_active)
+
+    @property
+    def pacing(self) -> Pacing:
+        """Learned command pacing for the current connection path."""
+        if self.pacing_table is None:
+            return self._pacing
+        return self.pacing_table.get(self.mac_address, self.connection_source)
+
+    @property
+    def connection_source(self) -> str:
+        """Return the adapter or proxy the bed is reached through."""
+        return self._source or _device_source(self._ble_device)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    def update_ble_device(self, ble_device, source: str | None = None) -> bool:
+        """Keep a newer BLEDevice only if it reaches the bed over another path.
+
+        ``source`` names the adapter or proxy the device was heard through, as
+        the route lookup does; without it the source is read from the device.
+        While a connection is held or being made the device is kept aside, so
+        the source its proxy slot and pacing are keyed on does not change under
+        it; the next connect uses the device. Returns True if the path changed.
+        """
+        source = source or _device_source(ble_device)
+        if self.is_connected or self._connecting is not None:
+            if self._ble_device is not None and source == self.connection_source:
+                self._next_ble_device = self._next_source = None
+                return False
+            if self._next_ble_device is not None and source == self._next_source:
+                return False
+            self._next_ble_device, self._next_source = ble_device, source
+            return True
+        if self._ble_device is not None and source == self.connection_source:
+            return False
+        self._ble_device, self._source = ble_device, source
+        self._next_ble_device = self._next_source = None
+        return True
+
+    async def connect(self, priority: int = PRIORITY_COMMAND):
+        """Connect with the current BLEDevice, reusing the client."""
+        await self._connect_bed(priority)
+
+    @property
+    def head_position(self) -> float:
+        return self.head.position
+
+    @head_position.setter
+    def head_position(self, position: float) -> None:
+        self.head.position = position
+
+    @property
+    def feet_position(self) -> float:
+        return self.foot.position
+
+    @feet_position.setter
+    def feet_position(self, position: float) -> None:
+        self.foot.position = position
+
     async def async_cleanup(self):
         """Cleanup method to be called when the bed is no longer needed."""
         self.logger.info("Cleaning up bed resources: %s", self.mac_address)
         await self._cleanup_and_disconnect()
 
-    async def set_ble_device(self, ble_device):
+    async def set_ble_device(self, ble_device, priority: int = PRIORITY_COMMAND):
         self.logger.warning("Setting BLE device for bed: %s", self.mac_address)
-        self._ble_device = ble_device
-        
+
         # Clean up existing client properly
         if self.client is not None:
             self.logger.warning("Already have client, cleaning up before updating device.")
             await self._cleanup_and_disconnect()
-        
-        # Create new client with optimized settings for ESP32 proxies
-        self.client = BleakClient(
+
+        self._ble_device, self._source = ble_device, None
+        self._next_ble_device = self._next_source = None
+        self.client = self._new_client(ble_device)
+        await self._connect_bed(priority)
+
+    def _load_connector(self) -> None:
+        if self._client_class is None or self._connector is None:
+            from bleak_retry_connector import (
+                BleakClientWithServiceCache,
+                establish_connection,
+            )
+
+            self._client_class = self._client_class or BleakClientWithServiceCache
+            self._connector = self._connector or establish_connection
+
+    def _new_client(self, ble_device):
+        self._load_connector()
+        # Optimized settings for ESP32 proxies
+        return self._client_class(
             address_or_ble_device=ble_device,
             timeout=CONNECTION_TIMEOUT,
             use_bonding=True
         )
-        await self._connect_bed()
+
+    def _ensure_client(self) -> bool:
+        """Create the client on first use, so setup never waits for the radio."""
+        if self._next_ble_device is not None and not self.is_connected:
+            self._ble_device, self._source = self._next_ble_device, self._next_source
+            self._next_ble_device = self._next_source = None
+        if self._ble_device is None and (path := self._best_path()) is not None:
+            # Under the name the router ranks it by, so routing keeps it
+            self._ble_device, self._source = path.device, path.source
+        if self._ble_device is None and self._ble_device_lookup is not None:
+            self._ble_device = self._ble_device_lookup(self.mac_address)
+        if self._ble_device is None:
+            # Nothing to connect to, though an open connection is still usable
+            return self.is_connected
+        if self.client is None:
+            self.client = self._new_client(self._ble_device)
+        return True
 
     async def set_flat(self):
         self.logger.warning("Move bed to flat position.")
-        await self._connect_bed()
-        
-        await self._move_to_flat()
+        await self.move_to(0, 0)
 
     async def disconnect_callback(self):
         """Force immediate disconnect and cleanup."""
@@ -113,25 +339,25 @@ class Bed:
     async def _cleanup_and_disconnect(self):
         """Clean up all resources and disconnect properly."""
         async with self._lock:
-            # Cancel any pending disconnect task
-            if self._disconnect_task:
-                self._disconnect_task.cancel()
-                try:
-                    await self._disconnect_task
-                except asyncio.CancelledError:
-                    pass
-                self._disconnect_task = None
-            
+            self._idle_timer.cancel()
+
             # Disconnect client if connected
             if self.client is not None and self.client.is_connected:
                 try:
                     self.logger.info("Disconnecting from bed: %s", self.mac_address)
                     
                     # Stop any active notifications first
-                    try:
-                        await self.client.stop_notify("99fa0011-338a-1024-8a49-009c0215f78a")  # DPG characteristic
-                    except Exception:
-                        pass  # Ignore errors if not subscribed
+                    if self._writer is not None:
+                        await self._writer.close()
+                        self._writer = None
+                    if self._dpg is not None:
+                        await self._dpg.close()
+                        self._dpg = None
+                    for actuator in self.actuators:
+                        try:
+                            await actuator.reference_output.unsubscribe(self.client)
+                        except Exception:
+                            pass
                     
                     await self.client.disconnect()
                     self.logger.info("Successfully disconnected from bed: %s", self.mac_address)
@@ -139,14 +365,42 @@ class Bed:
                     self.logger.warning("Error during disconnect: %s", ex)
             
             # Reset connection state
+            self.ready.clear()
+            self._close_positions()
             self._services_discovered = False
+            # The next session reads the identity again
+            self._capabilities_verified = False
+            for actuator in self.actuators:
+                actuator.measured = False
             
             # Clear any remaining references
-            self._ble_device = None
+            self._ble_device = self._source = None
+            self._release_slot()
+        self._notify_listeners()
+
+    def _on_disconnected(self, client) -> None:
+        """Bleak callback for disconnects we did not ask for."""
+        self.logger.debug("Bed %s disconnected", self.mac_address)
+        self.ready.clear()
+        self._idle_timer.cancel()
+        if self._dpg is not None:
+            asyncio.get_running_loop().create_task(self._dpg.close())
+            self._dpg = None
+        if self._writer is not None:
+            asyncio.get_running_loop().create_task(self._writer.close())
+            self._writer = None
+        self._close_positions()
+        # Subscriptions, Service Changed included, are made again on reconnect
+        self._services_discovered = False
+        # A firmware update reboots the control box, which drops the link
+        self._capabilities_verified = False
+        for actuator in self.actuators:
+            actuator.measured = False
+        self._release_slot()
+        self._notify_listeners()
 
-    def set_max(self):
-        self.set_max_head()
-        self.set_max_foot()
+    async def set_max(self):
+        await self.move_to(100, 100)
 
     async def set_flat_head(self):
         await self.move_head_rest_to(0)
@@ -162,261 +416,722 @@ class Bed:
 
     async def move_head_rest_to(self, position: float):
         self.logger.warning("Move head rest to %s", position)
-        self.moving_head_to_position = position
-        
-        await self._connect_bed()
-        if self.moving_head_active:
-            self.logger.warning("Head movement already in progress.")
+        await self.move_to(head=position)
+
+    async def move_foot_rest_to(self, position: float):
+        self.logger.warning("Move foot rest to %s", position)
+        await self.move_to(foot=position)
+
+    async def move_to(self, head: float | None = None, foot: float | None = None):
+        """Move the head and/or foot rest to a position.
+
+        While both actuators travel the same way they share one ALL_UP or
+        ALL_DOWN stream; whichever has further to go then finishes alone.
+        """
+        await self._move(
+            {
+                actuator: target
+                for actuator, target in ((self.head, head), (self.foot, foot))
+                if target is not None
+            }
+        )
+
+    async def _move(self, targets: dict[Actuator, float], command: bool = True):
+        """Post targets; the first caller runs the move, later ones retarget it.
+
+        ``command`` is False when the move continues a command that already
+        connected, so its connect is not counted again and a stop pressed
+        since that command arrived is kept.
+        """
+        if command:
+            # A stop pressed from here on, even while connecting, wins
+            self.stop_actions = False
+        idle = [actuator for actuator in targets if not actuator.active]
+        for actuator, target in targets.items():
+            if not actuator.measured and target in (0, 100) and actuator in idle:
+                # Without feedback the position is a guess, so drive a full stroke
+                actuator.position = 100 - target
+            actuator.mailbox.post(target, actuator.position)
+            if actuator not in idle:
+                self.logger.debug("%s movement retargeted to %s", actuator.name, target)
+        if not idle:
             return
-        
+
+        for actuator in idle:
+            actuator.active = True
         try:
-            self.moving_head_active = True
-            await self._move_head_to()
+            # Connect while the targets settle
+            await asyncio.gather(
+                self._connect_and_probe(command),
+                *(actuator.mailbox.settle() for actuator in idle),
+            )
+            if not self.ready.is_set():
+                raise NotConnectedError(f"Bed {self.mac_address} is not connected")
+            if self.stop_actions:
+                self.logger.debug("Stopped before the move started")
+                return
+            if self._reference_capable(idle):
+                # One write each; streaming below only corrects a miss
+                await self._move_by_reference(idle)
+            if not self.stop_actions and len(idle) == 2:
+                await self._move_together()
+            if not self.stop_actions:
+                await asyncio.gather(
+                    *(self._move_actuator_to(actuator) for actuator in idle)
+                )
         except Exception as ex:
-            self.logger.error("Error moving head to position: %s", ex)
+            self.logger.error("Error moving to position: %s", ex)
+            raise
         finally:
-            self.moving_head_active = False
-
+            for actuator in idle:
+                actuator.active = False
+            # The bed may be idle now, which frees its slot for a waiting bed
+            self._touch()
+            for actuator in idle:
+                coalesced = actuator.mailbox.coalesced
+                saved = actuator.mailbox.finish(actuator.commands_per_percent)
+                if coalesced:
+                    self.logger.info(
+                        "Coalesced %d %s targets, saving about %d commands",
+                        coalesced,
+                        actuator.name,
+                        saved,
+                    )
 
+    async def _move_together(self):
+        """Drive both actuators with ALL_UP/ALL_DOWN while they share a direction.
 
-    async def move_foot_rest_to(self, position: float):
-        self.moving_foot_to_position = position
-        if self.moving_foot_active:
-            self.logger.warning("Foot movement already in progress.")
+        Does nothing unless both actuators need to move the same way.
+        """
+        directions = {
+            actuator: actuator.direction_to(actuator.mailbox.target)
+            for actuator in self.actuators
+        }
+        direction = directions[self.head]
+        if direction == 0 or directions[self.foot] != direction:
             return
+        starts = {actuator: actuator.position for actuator in self.actuators}
+        end_stop = 100 if direction > 0 else 0
 
-        try: 
-            self.moving_foot_active = True
+        def reached(elapsed: float) -> bool:
+            self._touch()
+            done = []
+            for actuator, start in starts.items():
+                actuator.estimate(start, direction, elapsed)
+                done.append(
+                    actuator.reached(actuator.mailbox.target, direction)
+                    or (elapsed > STALL_TIMEOUT and actuator.stalled())
+                )
+            # An actuator bound for its end stop may overrun into it, so only
+            # stop early for one that has to halt mid-stroke
+            return all(done) or any(
+                finished and actuator.mailbox.target != end_stop
+                for actuator, finished in zip(self.actuators, done)
+            )
 
-            self.stop_actions = False
-            max_attempts = 500
+        def eta(elapsed: float) -> float:
+            etas = {
+                actuator: actuator.eta(actuator.mailbox.target, direction)
+                for actuator in self.actuators
+            }
+            mid_stroke = [
+                seconds
+                for actuator, seconds in etas.items()
+                if actuator.mailbox.target != end_stop
+            ]
+            return min([max(etas.values()), *mid_stroke])
 
+        self.logger.debug("Moving head and foot together (%+d)", direction)
+        await self._stream(
+            Command.ALL_UP if direction > 0 else Command.ALL_DOWN,
+            reached,
+            self.actuators,
+            eta,
+        )
 
-            await self._connect_bed()
+    @property
+    def calibration(self) -> dict[str, float]:
+        """Return the full stroke times per actuator and direction."""
+        calibration = {}
+        for actuator in self.actuators:
+            if actuator.calibrated:
+                calibration[f"{actuator.name}_up"] = actuator.stroke_times[1]
+                calibration[f"{actuator.name}_down"] = actuator.stroke_times[-1]
+        return calibration
 
-            while abs(self.feet_position - self.moving_foot_to_position) > 1.5:
-                max_attempts -= 1
-                if max_attempts == 0:
-                    self.logger.error("Failed to move foot to position.")
-                    break
-                if self.stop_actions:
-                    break
-                self.logger.warning(
-                    "Current foot position: %s - Moving to: %s",
-                    self.feet_position,
-                    self.moving_foot_to_position,
-                )
-                if self.feet_position < self.moving_foot_to_position:
-                    await self._foot_up()
-                else:
-                    await self._foot_down()
-        except Exception as ex:
-            self.logger.error("Error moving foot to position: %s", ex)
-        finally:
-            self.moving_foot_active = False
+    def set_calibration(self, calibration: dict[str, float] | None):
+        """Apply stroke times stored by a previous calibrate()."""
+        for actuator in self.actuators:
+            up = (calibration or {}).get(f"{actuator.name}_up")
+            down = (calibration or {}).get(f"{actuator.name}_down")
+            if _plausible_stroke(up) and _plausible_stroke(down):
+                actuator.set_calibration(up, down)
 
-    async def stop(self):
-        self.stop_actions = True
+    async def calibrate(self) -> dict[str, float]:
+        """Time a full stroke of both actuators in each direction.
 
-    async def _schedule_disconnect(self):
-        self.logger.info("Scheduling disconnect")
-        try:
-           await asyncio.sleep(20)
-           await self._disconnect_bed()
-        except asyncio.CancelledError:
-           self.logger.info("Bed disconnect task was canceled.")
+        The actuators are homed and then driven together with ALL_UP and
+        ALL_DOWN. End stops are detected from ReferenceOutput feedback. A run
+        that does not reach both end stops, or measures an implausible stroke
+        time, raises CalibrationError and keeps the previous calibration.
+        """
+        self.logger.warning("Calibrating bed: %s", self.mac_address)
+        self.stop_actions = False
+        await self._connect_bed(command=True)
+        if not all(actuator.measured for actuator in self.actuators):
+            raise CalibrationError("Calibration needs position feedback from the bed")
+
+        await self._run_to_end_stops(Command.ALL_DOWN, 0)
+        up = await self._run_to_end_stops(Command.ALL_UP, 100)
+        down = await self._run_to_end_stops(Command.ALL_DOWN, 0)
+
+        for actuator in self.actuators:
+            for direction, seconds in (("up", up[actuator]), ("down", down[actuator])):
+                if not _plausible_stroke(seconds):
+                    raise CalibrationError(
+                        f"Measured {seconds:.2f}s for a full {actuator.name} stroke "
+                        f"{direction}, which is implausible"
+                    )
+        for actuator in self.actuators:
+            actuator.set_calibration(round(up[actuator], 2), round(down[actuator], 2))
+        self.logger.info("Calibrated bed %s: %s", self.mac_address, self.calibration)
+        return self.calibration
 
+    async def _run_to_end_stops(
+        self, command: bytes, end_stop: float
+    ) -> dict[Actuator, float]:
+        """Drive until every actuator stalls and return how long each moved.
+
+        Raises CalibrationError unless every actuator stopped at ``end_stop``
+        with position feedback still flowing.
+        """
+        started = time.monotonic()
+
+        def reached(elapsed: float) -> bool:
+            self._touch()
+            return elapsed > STALL_TIMEOUT and all(
+                actuator.stalled() for actuator in self.actuators
+            )
 
-    async def _move_head_to(self):
+        await self._stream(command, reached)
+        if self.stop_actions:
+            raise CalibrationError("Calibration was interrupted")
+        if not self.ready.is_set() or not all(
+            actuator.measured for actuator in self.actuators
+        ):
+            raise CalibrationError("Lost position feedback during calibration")
+        if short := [
+            actuator.name
+            for actuator in self.actuators
+            if abs(actuator.position - end_stop) > POSITION_TOLERANCE
+        ]:
+            raise CalibrationError(
+                f"{', '.join(short)} stopped short of the end stop at {end_stop}%"
+            )
+        return {
+            actuator: actuator.last_change - started for actuator in self.actuators
+        }
+
+    async def move_to_reference(
+        self, head: float | None = None, foot: float | None = None
+    ):
+        """Move to absolute positions with a single ReferenceInput write each.
+
+        Falls back to streaming step commands when the bed does not report
+        ReferenceInput support or gives no position feedback.
+        """
+        targets = {
+            actuator: target
+            for actuator, target in ((self.head, head), (self.foot, foot))
+            if target is not None
+        }
+        self.logger.warning("Move to reference %s", targets)
         self.stop_actions = False
-        max_attempts = 500
+        await self._connect_bed(command=True)
+        capabilities = await self.get_capabilities()
+        if not capabilities.reference_input or not all(
+            actuator.measured for actuator in targets
+        ):
+            self.logger.debug("ReferenceInput unavailable, using step commands")
+            await self._move(targets, command=False)
+            return
 
-        while abs(self.head_position - self.moving_head_to_position) > 1.5:
-            max_attempts -= 1
-            if max_attempts == 0:
-                self.logger.error("Failed to move head to position.")
-                break
-            if self.stop_actions:
+        if self.stop_actions:
+            self.logger.debug("Stopped before the move started")
+            return
+        missed = await self._write_references(targets)
+        if missed and not self.stop_actions:
+            self.logger.warning("ReferenceInput move fell short, using step commands")
+            await self._move(
+                {actuator: targets[actuator] for actuator in missed}, command=False
+            )
+
+    async def _connect_and_probe(self, command: bool = True) -> None:
+        await self._connect_bed(command=command)
+        if self.ready.is_set():
+            await self.get_capabilities()
+
+    def _reference_capable(self, actuators) -> bool:
+        """True if ReferenceInput can drive these actuators to a target."""
+        return (
+            self.capabilities is not None
+            and self.capabilities.reference_input
+            and self.ready.is_set()
+            and all(actuator.measured for actuator in actuators)
+        )
+
+    async def _move_by_reference(self, actuators: list[Actuator]) -> None:
+        """Write the mailbox targets, and write them again when they change."""
+        while True:
+            targets = {actuator: actuator.mailbox.target for actuator in actuators}
+            missed = await self._write_references(targets, follow_mailbox=True)
+            if self.stop_actions or not self.ready.is_set() or all(
+                actuator.mailbox.target == target
+                for actuator, target in targets.items()
+            ):
                 break
-            self.logger.warning(
-                "Current head position: %s - Moving to: %s",
-                self.head_position,
-                self.moving_head_to_position,
+            self.logger.debug("ReferenceInput move retargeted")
+        if missed:
+            self.logger.debug("ReferenceInput move fell short, correcting")
+
+    async def _write_references(
+        self, targets: dict[Actuator, float], follow_mailbox: bool = False
+    ) -> list[Actuator]:
+        for actuator, target in targets.items():
+            await actuator.reference_input.write(
+                self.client,
+                ReferenceInputService.encode_height(actuator.to_raw(target)),
             )
-            if self.head_position < self.moving_head_to_position:
-                await self._head_up()
-            else:
-                await self._head_down()
+        return await self._watch_reference_move(targets, follow_mailbox)
 
-    async def _move_to_flat(self):
-        self.stop_actions = False
-        max_attempts = 500
-        self.head_position += 50
-        self.feet_position += 50
-        while abs(self.head_position) > 1.5 or abs(self.feet_position) > 1.5:
-            max_attempts -= 1
-            if max_attempts == 0:
-                self.logger.error("Failed to move head to position.")
+    async def _watch_reference_move(
+        self, targets: dict[Actuator, float], follow_mailbox: bool = False
+    ) -> list[Actuator]:
+        """Follow feedback until every actuator is at its target or stalled.
+
+        Gives up when the connection drops or the move takes longer than the
+        stroke times predict. With ``follow_mailbox`` it also returns as soon
+        as a new target is posted. Returns the actuators short of their target.
+        """
+        directions = {
+            actuator: 1 if target > actuator.position else -1
+            for actuator, target in targets.items()
+        }
+        deadline = REFERENCE_MOVE_MARGIN + max(
+            actuator.eta(target, directions[actuator])
+            for actuator, target in targets.items()
+        )
+        started = time.monotonic()
+        while not self.stop_actions and self.ready.is_set():
+            self._touch()
+            elapsed = time.monotonic() - started
+            if elapsed > deadline:
+                self.logger.warning("ReferenceInput move timed out")
                 break
-            if self.stop_actions:
+            if follow_mailbox and any(
+                actuator.mailbox.target != target
+                for actuator, target in targets.items()
+            ):
+                break
+            if all(
+                actuator.reached(target, directions[actuator])
+                or (elapsed > STALL_TIMEOUT and actuator.stalled())
+                for actuator, target in targets.items()
+            ):
                 break
-            self.logger.warning("Moving bed down position")                
-            await self._all_down()
+            await asyncio.sleep(MOTION_COMMAND_INTERVAL)
+        self._notify_listeners()
+        return [
+            actuator
+            for actuator, target in targets.items()
+            if abs(actuator.position - target) > POSITION_TOLERANCE
+        ]
 
+    async def dpg_request(self, command: int, data: bytearray | None = None):
+        """Send a DPG command over the connection's long-lived DPG channel."""
+        await self._connect_bed()
+        if self._dpg is None or self._dpg.client is not self.client:
+            self._dpg = DPGChannel(self.client, self.logger)
+        return await self._dpg.request(command, data)
 
-    async def _head_up(self):
-        """Move the head section of the bed up."""
-        await self._write_char(_COMMAND_HEAD_UP)
+    async def get_user_id(self) -> bytes | None:
+        return await self.dpg_request(DPGService.DPG.CMD_USER_ID)
 
-        # Update state
-        self.head_position = min(100, self.head_position + self.head_increment)
-        self.head_position = round(self.head_position, 2)
+    async def get_memory_position(self, slot: int) -> bytes | None:
+        """Return the raw memory position stored in slot 1-4."""
+        return await self.dpg_request(DPGService.DPG.CMD_MEMORY_POSITION_1 + slot - 1)
 
-    async def _all_down(self):
-        """Move the head section of the bed up."""
-        await self._write_char(_COMMAND_ALL_DOWN)
+    def set_capabilities(self, record: dict | None) -> None:
+        """Restore a capability record stored by a previous probe."""
+        if record:
+            self.capabilities = Capabilities.from_dict(record)
+            self._capabilities_verified = False
 
-        # Update state
-        self.head_position = max(0, self.head_position - self.head_increment)
-        self.head_position = round(self.head_position, 2)
-        self.feet_position = max(0, self.feet_position - self.feet_increment)
-        self.feet_position = round(self.feet_position, 2)
+    async def get_capabilities(self) -> Capabilities:
+        """Return what the bed supports, probing only for a new model or firmware.
 
-    async def _head_down(self):
-        """Move the head section of the bed down."""
-        await self._write_char(_COMMAND_HEAD_DOWN)
+        The model number and firmware revision are read once per session. A
+        restored record with the same identity is used as is; otherwise the
+        DPG capability and base offset commands are queried and the new record
+        is handed to ``on_capabilities``.
+        """
+        if self._capabilities_verified:
+            return self.capabilities
+        async with self._probe_lock:
+            if self._capabilities_verified:
+                return self.capabilities
+            try:
+                await self._connect_bed()
+                model, firmware = await self._read_identity()
+                if self.capabilities is not None and (
+                    self.capabilities.model,
+                    self.capabilities.firmware,
+                ) == (model, firmware):
+                    self._capabilities_verified = True
+                    return self.capabilities
+                self.logger.info(
+                    "Probing capabilities of %s (%s %s)", self.mac_address, model, firmware
+                )
+                self.capability_probes += 1
+                capabilities = Capabilities.decode(
+                    await self.dpg_request(DPGService.DPG.CMD_GET_CAPABILITIES)
+                )
+                offset = await self.dpg_request(DPGService.DPG.CMD_BASE_OFFSET)
+            except Exception as ex:
+                self.logger.warning("Capability query failed: %s", ex)
+                return self.capabilities or Capabilities()
+            self.capabilities = dataclasses.replace(
+                capabilities,
+                base_offset=codec.decode_position(offset) if offset else 0,
+                model=model,
+                firmware=firmware,
+            )
+            self._capabilities_verified = True
+            self.logger.debug("Bed capabilities: %s", self.capabilities)
+            if self.on_capabilities is not None:
+                self.on_capabilities(self.capabilities)
+        return self.capabilities
 
-        # Update state
-        self.head_position = max(0, self.head_position - self.head_increment)
-        self.head_position = round(self.head_position, 2)
+    async def _read_identity(self) -> tuple[str, str]:
+        """Model number and firmware revision, empty where the bed has none."""
 
-    async def _foot_up(self):
-        """Move the foot section of the bed up."""
-        await self._write_char(_COMMAND_FOOT_UP)
+        async def read(characteristic) -> str:
+            try:
+                data = await characteristic.read(self.client)
+            except Exception as ex:  # noqa: BLE001
+                self.logger.debug("Cannot read %s: %s", characteristic.__name__, ex)
+                return ""
+            return bytes(data).decode(errors="replace").strip("\x00 ")
 
-        # Update state
-        self.feet_position = min(100, self.feet_position + self.feet_increment)
-        self.feet_position = round(self.feet_position, 2)
+        return (
+            await read(GenericAccessService.MODEL_NUMBER),
+            await read(GenericAccessService.FIRMWARE_REVISION),
+        )
 
-    async def _foot_down(self):
-        """Move the foot section of the bed down."""
-        await self._write_char(_COMMAND_FOOT_DOWN)
+    def _command_writer(self) -> CommandWriter:
+        """The writer for the current connection's command characteristic."""
+        if self._writer is None or self._writer.client is not self.client:
+            self._writer = CommandWriter(
+                self.client, _UUID_COMMAND, self.logger, self.pacing
+            )
+        return self._writer
 
-        # Update state
-        self.feet_position = max(0, self.feet_position - self.feet_increment)
-        self.feet_position = round(self.feet_position, 2)
+    async def stop(self):
+        """Halt the bed now; STOP is written ahead of any queued step."""
+        self.stop_actions = True
+        for stream in self._streams:
+            stream.cancel()
+        if self.ready.is_set():
+            await self._command_writer().stop()
 
-    async def _disconnect_bed(self):
-        """Internal disconnect method used by scheduled disconnect."""
-        if self.client is None:
-            self.logger.debug("BLE client not initialized, skipping disconnect.")
-            return
+    async def _move_actuator_to(self, actuator: Actuator):
+        """Stream an actuator until it reports the mailbox target or stalls.
 
-        time_now = time.time()
-        if (time_now - self.last_time_used) > 4:
-            # Enough time has passed, safe to disconnect
-            await self._cleanup_and_disconnect()
-        else:
-            # Still being used recently, reschedule disconnect
-            self.logger.debug("Not disconnecting, bed was used recently.")
-            async with self._lock:
-                if self._disconnect_task:
-                    self._disconnect_task.cancel()
-                self._disconnect_task = asyncio.create_task(self._schedule_disconnect())
+        The target is re-read on every tick, so a new target in the same
+        direction extends the running stream. A target behind the actuator
+        ends the stream, and the actuator is reversed once it has come to rest.
+        """
+        mailbox = actuator.mailbox
+        last_miss: tuple[float, float] | None = None  # (target, distance)
+        while not self.stop_actions:
+            start = actuator.position
+            if abs(start - mailbox.target) <= POSITION_TOLERANCE:
+                return
+            direction = 1 if mailbox.target > start else -1
+            stalled = False
 
+            def reached(elapsed: float) -> bool:
+                nonlocal stalled
+                actuator.estimate(start, direction, elapsed)
+                self._touch()
+                self.logger.debug(
+                    "Current %s position: %s - Moving to: %s",
+                    actuator.name,
+                    actuator.position,
+                    mailbox.target,
+                )
+                if actuator.reached(mailbox.target, direction):
+                    return True
+                stalled = elapsed > STALL_TIMEOUT and actuator.stalled()
+                return stalled
 
-    async def _connect_bed(self):
-        if self.client is None:
-            self.logger.warning("BLE client not initialized, skipping connection.")
+            await self._stream(
+                actuator.command(direction),
+                reached,
+                (actuator,),
+                lambda elapsed: actuator.eta(mailbox.target, direction),
+            )
+            if stalled:
+                self.logger.warning("%s stopped moving before target", actuator.name)
+                return
+            miss = abs(actuator.position - mailbox.target)
+            if miss > POSITION_TOLERANCE:
+                if last_miss is not None and last_miss[0] == mailbox.target and (
+                    miss >= last_miss[1]
+                ):
+                    # A single command coasts further than the miss, so
+                    # reversing again would only oscillate around the target
+                    self.logger.debug(
+                        "%s settled %.1f%% from %s", actuator.name, miss, mailbox.target
+                    )
+                    return
+                last_miss = (mailbox.target, miss)
+                self.logger.debug(
+                    "Reversing %s towards %s", actuator.name, mailbox.target
+                )
+                await asyncio.gather(asyncio.sleep(REVERSAL_DWELL), mailbox.settle())
+
+    async def _stream(
+        self, command: bytes, reached, actuators=(), eta=None
+    ) -> float:
+        """Stream command until reached(elapsed) is true or stop() is called."""
+        if not await self.wait_ready(CONNECTION_DEADLINE):
+            raise NotConnectedError(f"Bed {self.mac_address} is not connected")
+        writer = self._command_writer()
+        interval = writer.pacing.cadence(
+            min(
+                (actuator.interval for actuator in actuators),
+                default=MOTION_COMMAND_INTERVAL,
+            )
+        )
+        stream = MotionStream(
+            writer,
+            bytes(command),
+            interval,
+            MOTION_MAX_IN_FLIGHT,
+            self.logger,
+        )
+        self._streams.add(stream)
+        if self.stop_actions:
+            stream.cancel()
+        try:
+            return await stream.run(reached, eta)
+        finally:
+            self._streams.discard(stream)
+            for actuator in actuators:
+                actuator.commands_sent += stream.writes
+            self._touch()
+            self._notify_listeners()
+
+    def _touch(self) -> None:
+        """Record activity, which pushes the idle disconnect back."""
+        self.last_time_used = time.time()
+        self._idle_timer.touch()
+        if self.connection_manager is not None:
+            self.connection_manager.touched(self)
+
+    def set_idle_policy(self, timeout: float, keep_connected: bool) -> None:
+        """Change how long the connection is held after the last command."""
+        self._idle_timer.timeout = timeout
+        self.keep_connected = keep_connected
+        self._idle_timer.cancel()
+        if self.is_connected:
+            self._idle_timer.touch()
+
+    def _on_idle(self) -> None:
+        """Idle timer callback: drop the connection unless it is still needed."""
+        if self.keep_connected or not self.is_connected:
             return
-        
-        if self.client.is_connected:
-            self.logger.debug("Already connected to bed.")
-            self.last_time_used = time.time()
+        if not self.is_idle or self._connecting is not None:
+            self._idle_timer.touch()
             return
-        
-        if self._ble_device is None:
-            self.logger.warning("BLE device not initialized, skipping connection.")
-            self._ble_device = bluetooth.async_ble_device_from_address(
-                self.hass, self.mac_address, connectable=True
+        self.logger.info("Disconnecting idle bed: %s", self.mac_address)
+        self.idle_disconnects += 1
+        self._idle_disconnect = asyncio.get_running_loop().create_task(
+            self._cleanup_and_disconnect()
+        )
+
+
+    async def _connect_bed(
+        self, priority: int = PRIORITY_COMMAND, command: bool = False
+    ):
+        """Connect, or join the connect that is already in progress.
+
+        Connecting is single-flight per bed: concurrent callers await the same
+        future, so there is one retry loop and one service discovery. The
+        shared connect keeps the priority of the caller that started it.
+        Only user commands pass ``command``, so a warm connection is counted
+        as a connect avoided once per command rather than per internal step.
+        """
+        if self._connecting is None:
+            if not self._ensure_client():
+                self.logger.warning(
+                    "Bed %s is not in range, skipping connection.", self.mac_address
+                )
+                return
+            if self.client.is_connected:
+                self.logger.debug("Already connected to bed.")
+                if command:
+                    self.connects_avoided += 1
+                self._touch()
+                return
+            self._connecting = asyncio.get_running_loop().create_task(
+                self._establish(priority)
+            )
+            self._connecting.add_done_callback(self._connect_done)
+        else:
+            self.connects_shared += 1
+            self.logger.debug("Joining connect in progress")
+        # One caller giving up must not cancel the connect for the others
+        await asyncio.shield(self._connecting)
+
+    def _connect_done(self, task: asyncio.Task) -> None:
+        if self._connecting is task:
+            self._connecting = None
+        if not task.cancelled():
+            task.exception()  # Retrieved by the waiters, or by nobody
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        """Wait for a connect in progress and report whether commands can go out."""
+        if not self.ready.is_set() and self._connecting is not None:
+            await asyncio.wait((self._connecting,), timeout=timeout)
+        return self.ready.is_set()
+
+    async def _establish(self, priority: int):
+        self._failed_sources.clear()
+        self._route()
+        acquire = None
+        if self.connection_manager is not None:
+            acquire = partial(
+                self.connection_manager.acquire,
+                self,
+                self.connection_source,
+                priority,
             )
 
-        attempts = 0
         self.logger.info("Attempting to connect to bed: %s", self.mac_address)
-        
-        while not self.client.is_connected and attempts < MAX_CONNECTION_ATTEMPTS:
-            try:
-                attempts += 1
-                self.logger.info("Connection attempt %d/%d", attempts, MAX_CONNECTION_ATTEMPTS)
-                
-                async with self._lock:
-                    # Cancel any pending disconnect task
-                    if self._disconnect_task:
-                        self._disconnect_task.cancel()
-                        self._disconnect_task = None
-                    
-                    # Connect with timeout using bleak-retry-connector for reliability
-                    try:
-                        self.logger.info("Connection to device %s", self._ble_device)
-                        self.client = await asyncio.wait_for(
-                            establish_connection(
-                                BleakClientWithServiceCache,
-                                device=self._ble_device,
-                                name=self.device_name,
-                                client=self.client,
-                                max_attempts=3,
-                                ble_device_callback=lambda: self._ble_device,
-                            ),
-                            timeout=CONNECTION_TIMEOUT
-                        )
-           
-                        self.logger.info("Successfully connected to bed.")
-                    except asyncio.TimeoutError:
-                        self.logger.warning("Connection attempt %d timed out after %ds", attempts, CONNECTION_TIMEOUT)
-                        if attempts < MAX_CONNECTION_ATTEMPTS:
-                            await asyncio.sleep(CONNECTION_RETRY_DELAY)
-                            continue
-                        else:
-                            raise
-                    
-                    # Optimized GATT service discovery with timeout
-                    if not self._services_discovered:
-                        try:
-                            await asyncio.wait_for(
-                                self._discover_services(),
-                                timeout=GATT_AUTH_TIMEOUT
-                            )
-                            self._services_discovered = True
-                        except asyncio.TimeoutError:
-                            self.logger.warning("GATT service discovery timed out, but proceeding...")
-                        except Exception as ex:
-                            self.logger.warning("GATT service discovery failed: %s, but proceeding...", ex)
-                    
-                    # Schedule automatic disconnect
-                    self._disconnect_task = asyncio.create_task(self._schedule_disconnect())
-                    
-                    # Minimal post-connection delay
-                    await asyncio.sleep(POST_CONNECTION_DELAY)
-                    
-                self.last_time_used = time.time()
-                return
-                
-            except (BleakError, BleakDBusError, OSError) as ex:
-                self.logger.warning("Connection attempt %d failed: %s", attempts, ex)
-                if attempts < MAX_CONNECTION_ATTEMPTS:
-                    await asyncio.sleep(CONNECTION_RETRY_DELAY)
-                else:
-                    self.logger.error("Failed to connect to bed after %d attempts", MAX_CONNECTION_ATTEMPTS)
-                    raise
-            except Exception as ex:
-                self.logger.error("Unexpected error during connection: %s", ex)
-                if attempts < MAX_CONNECTION_ATTEMPTS:
-                    await asyncio.sleep(CONNECTION_RETRY_DELAY)
-                else:
-                    raise
-        
-        self.last_time_used = time.time()
+        try:
+            # Waiting for a proxy slot counts against the connect deadline
+            await self.connection_policy.run(
+                partial(self._attempt_connect, priority), acquire
+            )
+        except Exception as ex:
+            self.logger.error("Failed to connect to bed: %s", ex or type(ex).__name__)
+            self._release_slot()
+            raise
+        self.connects_forced += 1
+        self._touch()
+
+    def route_paths(self) -> list[RoutePath]:
+        """Paths the bed is currently heard through."""
+        if self._route_lookup is None:
+            return []
+        return self._route_lookup(self.mac_address)
+
+    def describe_routes(self) -> dict[str, dict[str, Any]]:
+        """Connect history and current RSSI of each path, best first."""
+        if self.proxy_router is None:
+            return {}
+        return self.proxy_router.describe(self.mac_address, self.route_paths())
+
+    def _best_path(self) -> RoutePath | None:
+        """The path the router expects to connect fastest, skipping failed ones."""
+        if self.proxy_router is None:
+            return None
+        return self.proxy_router.choose(
+            self.mac_address, self.route_paths(), self._failed_sources
+        )
+
+    def _route(self) -> bool:
+        """Point the client at the best path to the bed; True if it moved."""
+        if self.is_connected:
+            return False
+        path = self._best_path()
+        if path is None or (
+            path.source == self.connection_source and self.client is not None
+        ):
+            return False
+        self.logger.info(
+            "Routing %s through %s (%s dBm)", self.mac_address, path.source, path.rssi
+        )
+        self._ble_device, self._source = path.device, path.source
+        self.client = self._new_client(path.device)
+        return True
+
+    async def _attempt_connect(self, priority: int = PRIORITY_COMMAND):
+        """One connection attempt; the connection policy owns retries."""
+        if self._failed_sources and self._route():
+            self.failovers += 1
+            if self.connection_manager is not None:
+                # The slot moves with the bed to the other proxy
+                await self.connection_manager.acquire(
+                    self, self.connection_source, priority
+                )
+        source = self.connection_source
+        started = time.monotonic()
+        try:
+            await self._connect_through_path()
+        except (Exception, asyncio.CancelledError):
+            # Timeouts of the policy arrive as cancellation
+            self._failed_sources.add(source)
+            if self.proxy_router is not None:
+                self.proxy_router.record(self.mac_address, source, None)
+            raise
+        if self.proxy_router is not None:
+            self.proxy_router.record(
+                self.mac_address, source, time.monotonic() - started
+            )
+
+    async def _connect_through_path(self):
+        async with self._lock:
+            if not self.client.is_connected:
+                self.logger.info("Connection to device %s", self._ble_device)
+                self._load_connector()
+                self.client = await self._connector(
+                    self._client_class,
+                    device=self._ble_device,
+                    name=self.device_name,
+                    client=self.client,
+                    cached_services=self._cached_services,
+                    disconnected_callback=self._on_disconnected,
+                    max_attempts=1,
+                    ble_device_callback=lambda: self._ble_device,
+                )
+                self.logger.info("Successfully connected to bed.")
+
+            # Optimized GATT service discovery with timeout
+            if not self._services_discovered:
+                try:
+                    await asyncio.wait_for(
+                        self._discover_services(),
+                        timeout=GATT_AUTH_TIMEOUT
+                    )
+                    self._services_discovered = True
+                except asyncio.TimeoutError:
+                    self.logger.warning("GATT service discovery timed out, but proceeding...")
+                except Exception as ex:
+                    self.logger.warning("GATT service discovery failed: %s, but proceeding...", ex)
+
+            await self._subscribe_positions()
+
+            # Minimal post-connection delay
+            await asyncio.sleep(POST_CONNECTION_DELAY)
+            self.ready.set()
+        self._notify_listeners()
 
+    def _release_slot(self):
+        if self.connection_manager is not None:
+            self.connection_manager.release(self)
 
     async def _discover_services(self):
         """Optimized service discovery for ESP32 proxies."""
@@ -429,9 +1144,11 @@ class Bed:
                 except Exception as ex:
                     self.logger.debug("MTU optimization failed (not critical): %s", ex)
             
+            services = self.client.services
+            await self._subscribe_service_changed()
+
             # Quick service discovery - just verify our command service exists
             # Use the services property instead of get_services() method
-            services = self.client.services
             command_service_found = False
             
             for service in services:
@@ -442,45 +1159,74 @@ class Bed:
             
             if not command_service_found:
                 self.logger.warning("Command service not found, but proceeding...")
+                return
+            # Handed back to bleak on the next connect
+            self._cached_services = services
             
         except Exception as ex:
             self.logger.warning("Service discovery error: %s", ex)
             raise
     
-    async def _write_char(self, cmd: bytearray):
-        self.last_time_used = time.time()
+    async def _subscribe_service_changed(self):
+        """Drop cached GATT layout when the bed reports its services changed."""
+        try:
+            await GenericAccessServiceChangedCharacteristic.subscribe(
+                self.client, self._on_service_changed
+            )
+        except Exception as ex:
+            self.logger.debug("Service Changed indications unavailable: %s", ex)
 
-        if self.client is None:
-            self.logger.warning("BLE client not initialized, skipping write.")
-            return
-        
-        if not self.client.is_connected:
-            self.logger.warning("Not connected, attempting to reconnect...")
-            await self._connect_bed()
-            if not self.client.is_connected:
-                self.logger.error("Failed to reconnect, skipping write.")
+    def _on_service_changed(self, sender, data: bytearray):
+        self.logger.info("GATT services changed on %s, clearing cache", self.mac_address)
+        self._cached_services = None
+        self._services_discovered = False
+        # New services may come with new firmware
+        self._capabilities_verified = False
+        if hasattr(self.client, "clear_cache"):
+            asyncio.get_running_loop().create_task(self.client.clear_cache())
+
+    async def _subscribe_positions(self):
+        """Follow the actuator positions through ReferenceOutput notifications.
+
+        Notifications land in a NotificationBuffer per actuator, so a burst
+        costs one position update and one listener call.
+        """
+        self._close_positions()
+
+        async def subscribe(actuator: Actuator):
+            buffer = NotificationBuffer()
+            try:
+                data = await actuator.reference_output.read(self.client)
+                actuator.handle_reference_output(None, data)
+                await actuator.reference_output.subscribe(self.client, buffer.put)
+            except Exception as ex:
+                actuator.measured = False
+                self.logger.warning(
+                    "No position feedback for %s, using dead reckoning: %s",
+                    actuator.name,
+                    ex,
+                )
                 return
-        
-        self.logger.debug(f"Transmitting command: {cmd.hex()}")
-        try:
-            # Write with timeout to prevent hanging
-            await asyncio.wait_for(
-                self.client.write_gatt_char(
-                    _UUID_COMMAND,
-                    cmd,
-                    response=True,
-                ),
-                timeout=2.0
+            task = asyncio.get_running_loop().create_task(
+                self._follow_positions(actuator, buffer)
             )
-            # Reduced delay for better responsiveness
-            await asyncio.sleep(0.17)
-            self.logger.debug("Command sent successfully.")
-        except asyncio.TimeoutError:
-            self.logger.error("Command write timed out")
-            raise
-        except Exception as e:
-            self.logger.error("Command write failed: %s", e)
-            raise
+            self._positions.append((buffer, task))
+
+        await asyncio.gather(*(subscribe(actuator) for actuator in self.actuators))
+
+    async def _follow_positions(self, actuator: Actuator, buffer: NotificationBuffer):
+        # Only the newest position of a batch matters
+        async for batch in buffer.batches():
+            try:
+                actuator.handle_reference_output(None, batch[-1])
+            except ValueError as ex:
+                self.logger.debug("Ignoring %s position: %s", actuator.name, ex)
+
+    def _close_positions(self) -> None:
+        """End the position followers; their buffers drop anything pending."""
+        for buffer, _ in self._positions:
+            buffer.close()
+        self._positions.clear()
 
     # def send_command(self, name):
     #     cmd = self.commands.get(name, None)
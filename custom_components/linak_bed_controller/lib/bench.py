@@ -0,0 +1,400 @@
+"""End to end movement benchmarks against the simulated bed.
+
+Run with ``python -m lib bench`` from ``custom_components/linak_bed_controller``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, fields
+import logging
+import struct
+import time
+from typing import Awaitable, Callable
+
+from . import codec
+from .bed import Bed
+from .connection_manager import ConnectionManager
+from .simulator import SimulatedBedDevice, SimulatedBleakClient, establish_connection
+from .util import NotificationBuffer
+
+_LOGGER = logging.getLogger(__name__)
+
+SETUP_BEDS = 3
+
+
+@dataclass
+class BenchResult:
+    """Outcome of a single benchmark run."""
+
+    name: str
+    seconds: float
+    writes: int
+    connects: int
+    head: float
+    foot: float
+
+
+@dataclass
+class BenchConfig:
+    """Simulator parameters shared by all benchmarks."""
+
+    head_stroke_time: float = 26.0
+    foot_stroke_time: float = 19.0
+    hold_time: float = 0.5
+    write_latency: float = 0.01
+    ack_latency: float = 0.03
+    connect_latency: float = 0.5
+    link_interval: float = 0.0
+
+    def make_device(self) -> SimulatedBedDevice:
+        return SimulatedBedDevice(
+            head_stroke_time=self.head_stroke_time,
+            foot_stroke_time=self.foot_stroke_time,
+            hold_time=self.hold_time,
+            write_latency=self.write_latency,
+            ack_latency=self.ack_latency,
+            connect_latency=self.connect_latency,
+            link_interval=self.link_interval,
+        )
+
+
+async def make_bed(
+    device: SimulatedBedDevice,
+    connect: bool = True,
+    connection_manager: ConnectionManager | None = None,
+) -> Bed:
+    """Create a Bed wired to the simulator instead of a real adapter."""
+    bed = Bed(
+        device.address,
+        device.name,
+        _LOGGER,
+        lambda address: device,
+        client_class=SimulatedBleakClient,
+        connector=establish_connection,
+        connection_manager=connection_manager,
+    )
+    # The client is created on the first connect, as for a real bed
+    if connect:
+        await bed._connect_bed()
+    return bed
+
+
+async def _run(
+    name: str,
+    config: BenchConfig,
+    action: Callable[[Bed], Awaitable[None]],
+    head: float = 0,
+    foot: float = 0,
+    connect: bool = True,
+) -> BenchResult:
+    device = config.make_device()
+    device.head.set_percentage(head)
+    device.foot.set_percentage(foot)
+    bed = await make_bed(device, connect)
+    bed.head_position = head
+    bed.feet_position = foot
+    device.reset_stats()
+    try:
+        start = time.perf_counter()
+        await action(bed)
+        elapsed = time.perf_counter() - start
+        # Let the actuators coast until the control box drops the command
+        while device.is_moving:
+            await asyncio.sleep(0.05)
+    finally:
+        await bed.async_cleanup()
+    return BenchResult(
+        name,
+        round(elapsed, 3),
+        len(device.writes),
+        device.connects,
+        device.head.percentage,
+        device.foot.percentage,
+    )
+
+
+async def bench_connect(config: BenchConfig) -> BenchResult:
+    return await _run("connect", config, Bed._connect_bed, connect=False)
+
+
+async def bench_head(config: BenchConfig) -> BenchResult:
+    return await _run("head 0->100", config, lambda bed: bed.move_head_rest_to(100))
+
+
+async def bench_head_cold(config: BenchConfig) -> BenchResult:
+    """First command after a lazy setup, connecting on demand."""
+    return await _run(
+        "head 0->100 cold",
+        config,
+        lambda bed: bed.move_head_rest_to(100),
+        connect=False,
+    )
+
+
+async def bench_foot(config: BenchConfig) -> BenchResult:
+    return await _run("foot 0->100", config, lambda bed: bed.move_foot_rest_to(100))
+
+
+async def bench_flat(config: BenchConfig) -> BenchResult:
+    return await _run("flat", config, Bed.set_flat, head=100, foot=100)
+
+
+async def bench_both(config: BenchConfig) -> BenchResult:
+    return await _run(
+        "head+foot planned", config, lambda bed: bed.move_to(head=60, foot=80)
+    )
+
+
+async def bench_both_separately(config: BenchConfig) -> BenchResult:
+    async def action(bed: Bed) -> None:
+        await asyncio.gather(bed.move_head_rest_to(60), bed.move_foot_rest_to(80))
+
+    return await _run("head+foot separately", config, action)
+
+
+async def bench_reference(config: BenchConfig) -> BenchResult:
+    return await _run(
+        "reference 0->100",
+        config,
+        lambda bed: bed.move_to_reference(head=100, foot=100),
+    )
+
+
+async def bench_stop(config: BenchConfig) -> BenchResult:
+    """Seconds from Bed.stop() until the simulator halts the actuators."""
+    device = config.make_device()
+    bed = await make_bed(device)
+    device.reset_stats()
+    try:
+        move = asyncio.create_task(bed.move_head_rest_to(100))
+        await asyncio.sleep(1.0)
+        requested = time.monotonic()
+        await bed.stop()
+        await move
+        latency = device.halted_at - requested
+    finally:
+        await bed.async_cleanup()
+    return BenchResult(
+        "stop latency",
+        round(latency, 3),
+        len(device.writes),
+        device.connects,
+        device.head.percentage,
+        device.foot.percentage,
+    )
+
+
+async def _setup(name: str, config: BenchConfig, connect: bool) -> BenchResult:
+    """Seconds from setting up SETUP_BEDS beds on one proxy to a first move each.
+
+    Setup is what the entry does with the bed, with or without connecting;
+    the move then waits for whatever connect setup left to it.
+    """
+    manager = ConnectionManager()
+    devices = [config.make_device() for _ in range(SETUP_BEDS)]
+
+    async def setup_and_move(device: SimulatedBedDevice) -> Bed:
+        bed = await make_bed(device, connect, manager)
+        await bed.move_head_rest_to(10)
+        return bed
+
+    start = time.perf_counter()
+    beds = await asyncio.gather(*(setup_and_move(device) for device in devices))
+    elapsed = time.perf_counter() - start
+    for bed in beds:
+        await bed.async_cleanup()
+    return BenchResult(
+        name,
+        round(elapsed, 3),
+        sum(len(device.writes) for device in devices),
+        sum(device.connects for device in devices),
+        round(sum(device.head.percentage for device in devices) / SETUP_BEDS, 1),
+        0,
+    )
+
+
+async def bench_setup_eager(config: BenchConfig) -> BenchResult:
+    """Entry setup that waits for the connection, as it used to."""
+    return await _setup(f"setup+move {SETUP_BEDS} eager", config, True)
+
+
+async def bench_setup_lazy(config: BenchConfig) -> BenchResult:
+    """Entry setup that leaves connecting to the first command."""
+    return await _setup(f"setup+move {SETUP_BEDS} lazy", config, False)
+
+
+BENCHMARKS: dict[str, Callable[[BenchConfig], Awaitable[BenchResult]]] = {
+    "connect": bench_connect,
+    "head": bench_head,
+    "head-cold": bench_head_cold,
+    "foot": bench_foot,
+    "flat": bench_flat,
+    "both": bench_both,
+    "both-separately": bench_both_separately,
+    "reference": bench_reference,
+    "stop": bench_stop,
+    "setup-eager": bench_setup_eager,
+    "setup-lazy": bench_setup_lazy,
+}
+
+
+async def _pump(put, consume, packets: int, burst: int) -> float:
+    """Feed packets to put() in bursts and return packets per second."""
+    payload = bytearray(codec.POSITION_SPEED.pack(1234, 56))
+    start = time.perf_counter()
+    consumer = asyncio.create_task(consume())
+    for _ in range(0, packets, burst):
+        for _ in range(burst):
+            put(None, payload)
+        await asyncio.sleep(0)
+    await consumer
+    return packets / (time.perf_counter() - start)
+
+
+async def bench_legacy_queue(packets: int, burst: int) -> float:
+    """The unbounded queue plus call_soon_threadsafe that make_iter used."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def put(*args):
+        loop.call_soon_threadsafe(queue.put_nowait, args)
+
+    async def consume():
+        for _ in range(packets):
+            _, data = await queue.get()
+            struct.unpack("<Hh", data)
+
+    return await _pump(put, consume, packets, burst)
+
+
+async def bench_notification_buffer(packets: int, burst: int) -> float:
+    buffer = NotificationBuffer()
+
+    async def consume():
+        seen = 0
+        while seen < packets - buffer.dropped:
+            batch = await buffer.get_batch()
+            for _ in codec.iter_position_speed(batch):
+                pass
+            seen += len(batch)
+
+    rate = await _pump(buffer.put, consume, packets, burst)
+    buffer.close()
+    return rate
+
+
+def bench_notifications(packets: int = 200_000, burst: int = 32) -> list[tuple[str, float]]:
+    """Notification packets per second through each pipeline."""
+
+    async def run():
+        return [
+            ("legacy queue", await bench_legacy_queue(packets, burst)),
+            ("notification buffer", await bench_notification_buffer(packets, burst)),
+        ]
+
+    return asyncio.run(run())
+
+
+def _legacy_dpg_write_frame(command: int, data: bytes) -> bytes:
+    """How gatt.py built DPG write frames before the codec module."""
+    header = struct.pack("BBB", 127, command, 128)
+    buffer = bytes()
+    for val in data:
+        buffer += struct.pack("B", val)
+    return header + buffer
+
+
+def _rate(function: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - start)
+
+
+def bench_codec(iterations: int = 100_000) -> list[tuple[str, float]]:
+    """Calls per second of the old inline encoders against the codec module."""
+    payload = bytes(range(16))
+    batch = [memoryview(codec.POSITION_SPEED.pack(i, 10)) for i in range(32)]
+    cases = {
+        "control frame": (
+            lambda: bytearray(struct.pack("BB", 71, 0)),
+            lambda: codec.control_frame(71),
+        ),
+        "dpg read frame": (
+            lambda: bytearray(struct.pack("BBB", 127, 134, 0)),
+            lambda: codec.dpg_read_frame(134),
+        ),
+        "dpg write frame": (
+            lambda: _legacy_dpg_write_frame(134, payload),
+            lambda: codec.dpg_write_frame(134, payload),
+        ),
+        "decode batch of 32": (
+            lambda: [struct.unpack_from("<Hh", packet) for packet in batch],
+            lambda: list(codec.iter_position_speed(batch)),
+        ),
+    }
+    results = []
+    for name, (legacy, current) in cases.items():
+        results.append((f"{name} (legacy)", _rate(legacy, iterations)))
+        results.append((f"{name} (codec)", _rate(current, iterations)))
+    return results
+
+
+MICRO_BENCHMARKS: dict[str, Callable[[], list[tuple[str, float]]]] = {
+    "notifications": bench_notifications,
+    "codec": bench_codec,
+}
+
+
+async def run_benchmarks(
+    config: BenchConfig, names: list[str] | None = None
+) -> list[BenchResult]:
+    """Run the selected benchmarks sequentially on one event loop."""
+    return [await BENCHMARKS[name](config) for name in names or BENCHMARKS]
+
+
+def format_results(results: list[BenchResult]) -> str:
+    header = [field.name for field in fields(BenchResult)]
+    rows = [header] + [
+        [str(getattr(result, column)) for column in header] for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="|".join([*BENCHMARKS, *MICRO_BENCHMARKS]),
+        help="default: all movement benchmarks",
+    )
+    for field in fields(BenchConfig):
+        parser.add_argument(
+            "--" + field.name.replace("_", "-"), type=float, default=field.default
+        )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if unknown := set(args.benchmarks) - {*BENCHMARKS, *MICRO_BENCHMARKS}:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.ERROR)
+    config = BenchConfig(
+        **{field.name: getattr(args, field.name) for field in fields(BenchConfig)}
+    )
+    micro = [name for name in args.benchmarks if name in MICRO_BENCHMARKS]
+    for name in micro:
+        for case, rate in MICRO_BENCHMARKS[name]():
+            print(f"{case:<28} {rate:>12,.0f} /s")
+    args.benchmarks = [name for name in args.benchmarks if name not in micro]
+    if micro and not args.benchmarks:
+        return
+    print(format_results(asyncio.run(run_benchmarks(config, args.benchmarks))))
+
+
+if __name__ == "__main__":
+    main()
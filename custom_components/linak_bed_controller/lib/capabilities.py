@@ -0,0 +1,48 @@
+"""Decoding of the DPG capability record reported by Linak control boxes."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """What a control box reports it supports."""
+
+    memory_slots: int = 0
+    auto_up: bool = False
+    auto_down: bool = False
+    ble_allow: bool = False
+    has_display: bool = False
+    has_light: bool = False
+    reference_input: bool = False
+    base_offset: int = 0  # raw CMD_BASE_OFFSET value
+    # What the record was probed from; a new model or firmware needs a new probe
+    model: str = ""
+    firmware: str = ""
+
+    @classmethod
+    def decode(cls, data: bytes | bytearray | None) -> Capabilities:
+        """Decode the payload of a CMD_GET_CAPABILITIES response."""
+        if not data:
+            return cls()
+        flags = data[0]
+        return cls(
+            memory_slots=flags & 0x07,
+            auto_up=bool(flags & 0x08),
+            auto_down=bool(flags & 0x10),
+            ble_allow=bool(flags & 0x20),
+            has_display=bool(flags & 0x40),
+            has_light=bool(flags & 0x80),
+            reference_input=len(data) > 1 and bool(data[1] & 0x01),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Capabilities:
+        """Rebuild a stored record, ignoring keys this version does not know."""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
@@ -0,0 +1,111 @@
+"""Encoding and decoding of the frames exchanged with a Linak control box.
+
+Every fixed frame is built once at import time and shared as immutable
+``bytes``; the variable ones go through precompiled ``struct.Struct`` objects.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+import struct
+from typing import Iterable, Iterator, Sequence
+
+BYTE_PAIR = struct.Struct("BB")
+DPG_HEADER = struct.Struct("BBB")
+POSITION = struct.Struct("<H")
+POSITION_SPEED = struct.Struct("<Hh")
+
+DPG_PREFIX = 0x7F
+DPG_WRITE = 0x80
+DPG_STATUS_OK = 0x01
+
+
+class Command(bytes, Enum):
+    """Control command frames for the bed."""
+
+    ALL_DOWN = b"\x00\x00"
+    ALL_UP = b"\x01\x00"
+    STOP_MOVEMENT = b"\xff\x00"
+    HEAD_UP = b"\x0b\x00"
+    HEAD_DOWN = b"\x0a\x00"
+    FOOT_UP = b"\x09\x00"
+    FOOT_DOWN = b"\x08\x00"
+
+
+_CONTROL_FRAMES = tuple(BYTE_PAIR.pack(command, 0) for command in range(256))
+_DPG_READ_FRAMES = tuple(
+    DPG_HEADER.pack(DPG_PREFIX, command, 0) for command in range(256)
+)
+_DPG_WRITE_HEADERS = tuple(
+    DPG_HEADER.pack(DPG_PREFIX, command, DPG_WRITE) for command in range(256)
+)
+
+
+def _check_command(command: int) -> int:
+    if not 0 <= command <= 0xFF:
+        raise ValueError("Command must be an integer between 0 and 255")
+    return command
+
+
+def control_frame(command: int) -> bytes:
+    """Frame for a numeric ControlCommand command."""
+    return _CONTROL_FRAMES[_check_command(command)]
+
+
+def dpg_read_frame(command: int) -> bytes:
+    """Frame that asks the DPG characteristic for the value of a command."""
+    return _DPG_READ_FRAMES[_check_command(command)]
+
+
+def dpg_write_frame(command: int, data: bytes | bytearray | Iterable[int]) -> bytes:
+    """Frame that writes data to a DPG command."""
+    return _DPG_WRITE_HEADERS[_check_command(command)] + bytes(data)
+
+
+def decode_dpg_response(data: bytes | bytearray | memoryview) -> bytes | None:
+    """Payload of a DPG notification, or None if the box rejected the request."""
+    if len(data) < 2:
+        raise ValueError(f"DPG response of {len(data)} bytes has no header")
+    if data[0] != DPG_STATUS_OK:
+        return None
+    return bytes(data[2:])
+
+
+def encode_position(position: int | str) -> bytes:
+    """Absolute ReferenceInput target."""
+    try:
+        return POSITION.pack(int(position))
+    except struct.error:
+        raise ValueError("Height must be an integer between 0 and 65535") from None
+
+
+def decode_position(data: bytes | bytearray | memoryview) -> int:
+    """Raw position from a ReferenceInput or DPG position value."""
+    try:
+        return POSITION.unpack_from(data)[0]
+    except struct.error:
+        raise ValueError(f"Position of {len(data)} bytes is too short") from None
+
+
+def decode_position_speed(data: bytes | bytearray | memoryview) -> tuple[int, int]:
+    """Position and speed from a ReferenceOutput value."""
+    try:
+        return POSITION_SPEED.unpack_from(data)
+    except struct.error:
+        raise ValueError(f"ReferenceOutput of {len(data)} bytes is too short") from None
+
+
+def iter_position_speed(
+    packets: Sequence[bytes | bytearray | memoryview],
+) -> Iterator[tuple[int, int]]:
+    """Decode a batch of ReferenceOutput notifications in one pass.
+
+    The batch is joined and decoded with ``iter_unpack``. A batch that is not
+    made of whole records is rejected rather than losing its partial tail.
+    """
+    data = b"".join(packets)
+    if len(data) % POSITION_SPEED.size:
+        raise ValueError(
+            f"ReferenceOutput batch of {len(data)} bytes is not whole records"
+        )
+    return POSITION_SPEED.iter_unpack(data)
@@ -0,0 +1,131 @@
+"""Share Bluetooth proxy connection slots between several beds.
+
+ESP32 proxies only have a handful of connection slots. The manager hands them
+out per proxy (``source``), queues requests by priority when a proxy is full and
+evicts the bed that has been idle the longest to make room.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import logging
+from typing import Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_COMMAND = 0  # A user is waiting for the bed to move
+PRIORITY_BACKGROUND = 1  # Startup, advertisement driven reconnects
+
+DEFAULT_SLOTS_PER_SOURCE = 3
+
+
+class ManagedBed(Protocol):
+    """What the manager needs to know about a bed."""
+
+    mac_address: str
+    last_time_used: float
+
+    @property
+    def is_idle(self) -> bool: ...
+
+    async def disconnect_callback(self) -> None: ...
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    bed: ManagedBed = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class ConnectionManager:
+    """Hand out proxy connection slots to beds."""
+
+    def __init__(self, slots_per_source: int = DEFAULT_SLOTS_PER_SOURCE) -> None:
+        self.slots_per_source = slots_per_source
+        self._holders: dict[str, set[ManagedBed]] = {}
+        self._sources: dict[ManagedBed, str] = {}
+        self._waiters: dict[str, list[_Waiter]] = {}
+        self._sequence = itertools.count()
+        self._evicting: set[ManagedBed] = set()
+
+    def usage(self, source: str) -> int:
+        return len(self._holders.get(source, ()))
+
+    def holds_slot(self, bed: ManagedBed, source: str) -> bool:
+        return self._sources.get(bed) == source
+
+    async def acquire(
+        self, bed: ManagedBed, source: str, priority: int = PRIORITY_COMMAND
+    ) -> None:
+        """Wait until bed may connect through source."""
+        if self.holds_slot(bed, source):
+            return
+        self.release(bed)
+
+        holders = self._holders.setdefault(source, set())
+        waiters = self._waiters.setdefault(source, [])
+        if len(holders) < self.slots_per_source and not waiters:
+            self._grant(bed, source)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, _Waiter(priority, next(self._sequence), bed, future))
+        _LOGGER.debug(
+            "%s queued for proxy %s (%d/%d slots in use)",
+            bed.mac_address,
+            source,
+            len(holders),
+            self.slots_per_source,
+        )
+        self._evict_idle(source)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted while we were being cancelled
+                self.release(bed)
+            else:
+                waiters[:] = [w for w in waiters if w.future is not future]
+                heapq.heapify(waiters)
+            raise
+
+    def release(self, bed: ManagedBed) -> None:
+        """Give back the slot held by bed, if any."""
+        self._evicting.discard(bed)
+        if (source := self._sources.pop(bed, None)) is None:
+            return
+        self._holders[source].discard(bed)
+        waiters = self._waiters.get(source, [])
+        while waiters and len(self._holders[source]) < self.slots_per_source:
+            waiter = heapq.heappop(waiters)
+            if not waiter.future.done():
+                self._grant(waiter.bed, source)
+                waiter.future.set_result(None)
+
+    def touched(self, bed: ManagedBed) -> None:
+        """Retry eviction when a bed holding a contended slot may have gone idle."""
+        if (source := self._sources.get(bed)) is not None and self._waiters.get(source):
+            self._evict_idle(source)
+
+    def _grant(self, bed: ManagedBed, source: str) -> None:
+        self._holders[source].add(bed)
+        self._sources[bed] = source
+
+    def _evict_idle(self, source: str) -> None:
+        """Disconnect the longest idle bed on source to free a slot."""
+        candidates = [
+            bed
+            for bed in self._holders.get(source, ())
+            if bed.is_idle and bed not in self._evicting
+        ]
+        if not candidates:
+            return
+        bed = min(candidates, key=lambda candidate: candidate.last_time_used)
+        _LOGGER.info("Evicting idle bed %s from proxy %s", bed.mac_address, source)
+        self._evicting.add(bed)
+        asyncio.get_running_loop().create_task(bed.disconnect_callback())
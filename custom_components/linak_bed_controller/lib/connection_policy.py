@@ -0,0 +1,197 @@
+"""One retry budget for everything involved in connecting to a bed.
+
+A connect is a series of attempts, each bounded by its own timeout, under a
+total deadline. Failed attempts back off exponentially with full jitter, so
+beds sharing a proxy do not retry in lockstep. After repeated failures the
+circuit opens and connects fail immediately until a cool-down has passed; the
+next connect then probes the bed with a single run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+import logging
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from bleak.exc import BleakError
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CONNECTION_BACKOFF_BASE,
+    CONNECTION_BACKOFF_MAX,
+    CONNECTION_DEADLINE,
+    CONNECTION_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+RETRYABLE_ERRORS = (BleakError, OSError, asyncio.TimeoutError)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(BleakError):
+    """Raised instead of connecting while the circuit is open."""
+
+
+class DeadlineExceededError(BleakError):
+    """Raised when the deadline passes before the first attempt could start."""
+
+
+@dataclass(frozen=True)
+class ConnectAttempt:
+    """Metrics for a single connection attempt."""
+
+    started: float  # wall clock
+    seconds: float
+    success: bool
+    error: str | None = None
+
+
+class ConnectionPolicy:
+    """Deadline, backoff and circuit breaker for connecting to one bed."""
+
+    def __init__(
+        self,
+        deadline: float = CONNECTION_DEADLINE,
+        attempt_timeout: float = CONNECTION_TIMEOUT,
+        backoff_base: float = CONNECTION_BACKOFF_BASE,
+        backoff_max: float = CONNECTION_BACKOFF_MAX,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        logger: logging.Logger = _LOGGER,
+    ) -> None:
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logger
+
+        self.history: deque[ConnectAttempt] = deque(maxlen=20)
+        self.attempts = 0
+        self.failures = 0
+        self.circuit_opened = 0
+        self.consecutive_failures = 0
+        self._opened_at: float | None = None
+        self.on_attempt: Callable[[ConnectAttempt], None] | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: a random delay up to the exponential bound."""
+        bound = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, bound)
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[_T]],
+        prepare: Callable[[], Awaitable[None]] | None = None,
+    ) -> _T:
+        """Call ``attempt`` until it succeeds, the deadline passes or it fails hard.
+
+        Only Bluetooth, OS and timeout errors are retried. When the circuit is
+        open this raises CircuitOpenError without trying. ``prepare``, such as
+        waiting for a proxy slot, is awaited first under the same deadline; it
+        is not an attempt and does not count towards the circuit.
+        """
+        state = self.state
+        if state == STATE_OPEN:
+            raise CircuitOpenError(
+                f"Circuit open after {self.consecutive_failures} failed attempts"
+            )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        if prepare is not None:
+            try:
+                await asyncio.wait_for(prepare(), self.deadline)
+            except asyncio.TimeoutError as ex:
+                raise DeadlineExceededError(
+                    f"Could not start connecting within {self.deadline}s"
+                ) from ex
+        number = 0
+        while True:
+            number += 1
+            started = loop.time()
+            timeout = min(self.attempt_timeout, deadline - started)
+            try:
+                result = await asyncio.wait_for(attempt(), timeout)
+            except RETRYABLE_ERRORS as ex:
+                self._record(started, ex)
+                delay = self.backoff(number)
+                if (
+                    state == STATE_HALF_OPEN
+                    or self.state == STATE_OPEN
+                    or loop.time() + delay >= deadline
+                ):
+                    raise
+                self.logger.debug(
+                    "Connection attempt %d failed (%s), retrying in %.2fs",
+                    number,
+                    ex or type(ex).__name__,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+            except Exception as ex:
+                self._record(started, ex)
+                raise
+            else:
+                self._record(started, None)
+                return result
+
+    def _record(self, started: float, error: BaseException | None) -> None:
+        seconds = asyncio.get_running_loop().time() - started
+        record = ConnectAttempt(
+            time.time() - seconds,
+            round(seconds, 3),
+            error is None,
+            None if error is None else str(error) or type(error).__name__,
+        )
+        self.history.append(record)
+        self.attempts += 1
+        if error is None:
+            self.consecutive_failures = 0
+            self._opened_at = None
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if (
+                self.consecutive_failures >= self.failure_threshold
+                or self._opened_at is not None
+            ):
+                if self._opened_at is None:
+                    self.circuit_opened += 1
+                    self.logger.warning(
+                        "Opening connection circuit after %d failed attempts",
+                        self.consecutive_failures,
+                    )
+                self._opened_at = time.monotonic()
+        if self.on_attempt is not None:
+            self.on_attempt(record)
+
+    def as_dict(self) -> dict:
+        """Counters and recent attempts for diagnostics."""
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_opened": self.circuit_opened,
+            "recent": [asdict(attempt) for attempt in self.history],
+        }
@@ -0,0 +1,62 @@
+"""Constants for the bed core library."""
+
+# Connection configuration optimized for ESP32 Bluetooth proxies
+CONNECTION_TIMEOUT = 10  # seconds per attempt
+CONNECTION_DEADLINE = 30  # seconds for all attempts of one connect together
+CONNECTION_BACKOFF_BASE = 0.5  # seconds, doubled per failed attempt
+CONNECTION_BACKOFF_MAX = 8  # seconds
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failed attempts before failing fast
+CIRCUIT_RESET_TIMEOUT = 60  # seconds before a failed bed is tried again
+GATT_AUTH_TIMEOUT = 3  # seconds (reduced from 10)
+POST_CONNECTION_DELAY = 0.3  # seconds (reduced from 1.5)
+# Connections are dropped after this long without a command, unless the bed is
+# kept connected
+IDLE_DISCONNECT_TIMEOUT = 20  # seconds
+
+# Proxy routing: paths to a bed are ranked by expected time to first command.
+# Paths without history are estimated from their RSSI
+PROXY_HISTORY = 10  # connect outcomes remembered per bed and path
+PROXY_LATENCY_PRIOR = 2.0  # seconds to connect through a strong, unknown path
+PROXY_RSSI_REFERENCE = -60  # dBm, no penalty above this
+PROXY_RSSI_PENALTY = 0.05  # seconds per dB below the reference
+
+# ESP32 Bluetooth proxy optimizations
+ESP32_MTU_SIZE = 185  # Optimal MTU for ESP32
+
+# Streaming motion: the control box keeps an actuator running for roughly half a
+# second after each move command, so stream commands on a shorter cadence
+MOTION_COMMAND_INTERVAL = 0.25  # seconds
+MOTION_MAX_IN_FLIGHT = 2  # unacknowledged writes allowed at once
+# Calibrated moves run for a computed duration and only need to keep the motor
+# alive, so they can use a slower cadence just inside the hold window
+MOTION_KEEPALIVE_INTERVAL = 0.4  # seconds
+
+# Command pacing is learned per bed and proxy: the interval shrinks additively
+# after a window of clean writes and grows multiplicatively on errors, timeouts
+# or writes that take longer than the interval itself. Streaming faster than
+# the motion cadence gains nothing, so that is the floor
+PACING_MIN_INTERVAL = MOTION_COMMAND_INTERVAL
+PACING_MAX_INTERVAL = 0.45  # seconds, must stay inside the hold window
+PACING_WINDOW = 8  # clean writes before the interval shrinks
+PACING_DECREASE = 0.01  # seconds
+PACING_BACKOFF = 1.5
+
+# Full stroke travel time, used for dead reckoning while streaming
+HEAD_STROKE_TIME = 26.0  # seconds (~130 legacy steps)
+FOOT_STROKE_TIME = 19.0  # seconds (~95 legacy steps)
+# Measured stroke times outside this range are rejected as a failed calibration
+CALIBRATION_MIN_STROKE = 2.0  # seconds
+CALIBRATION_MAX_STROKE = 120.0  # seconds
+POSITION_TOLERANCE = 1.5  # percent
+
+# ReferenceOutput position feedback
+REFERENCE_POSITION_MAX = 10000  # raw position reported at full stroke
+STALL_TIMEOUT = 1.0  # seconds without position change while commanded
+# A ReferenceInput move is abandoned this long after the stroke times say it
+# should have arrived
+REFERENCE_MOVE_MARGIN = 3.0  # seconds
+
+# Slider drags: wait this long for the target to settle before moving, and let
+# an actuator come to rest before reversing it
+COMMAND_DEBOUNCE = 0.2  # seconds
+REVERSAL_DWELL = 0.5  # seconds
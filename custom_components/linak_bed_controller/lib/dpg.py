@@ -0,0 +1,120 @@
+"""Long-lived DPG request/response channel.
+
+The DPG characteristic answers every request with a single notification of
+the form ``[status, length, payload...]``. The answer does not echo the command,
+but the control box answers in order, so responses are matched first in, first
+out against the command ids of the pending requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+from typing import TYPE_CHECKING
+
+from .codec import decode_dpg_response, dpg_read_frame
+from .gatt import DPGService
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
+
+DPG_TIMEOUT = 2.0  # seconds
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    command: int
+    future: asyncio.Future
+    # A request that timed out still owns the next response until it expires,
+    # so a late answer is not handed to the request queued behind it
+    expires: float = field(default=float("inf"))
+
+
+class DPGChannel:
+    """Keep the DPG characteristic subscribed and correlate requests."""
+
+    def __init__(
+        self, client: BleakClient, logger: logging.Logger = _LOGGER
+    ) -> None:
+        self.client = client
+        self.logger = logger
+        self._pending: deque[_Pending] = deque()
+        self._open = False
+        self._opening = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    async def open(self) -> None:
+        async with self._opening:
+            if not self._open:
+                await DPGService.DPG.subscribe(self.client, self._handle_notification)
+                self._open = True
+
+    async def close(self) -> None:
+        """Unsubscribe and fail every request still waiting for an answer."""
+        was_open, self._open = self._open, False
+        while self._pending:
+            pending = self._pending.popleft()
+            if pending.future.done():
+                continue
+            if pending.expires != float("inf"):
+                pending.future.cancel()  # Nobody is waiting for it any more
+            else:
+                pending.future.set_exception(ConnectionError("DPG channel closed"))
+        if was_open and self.client.is_connected:
+            try:
+                await DPGService.DPG.unsubscribe(self.client)
+            except Exception as ex:  # noqa: BLE001
+                self.logger.debug("Failed to unsubscribe from DPG: %s", ex)
+
+    async def request(
+        self,
+        command: int,
+        data: bytearray | None = None,
+        timeout: float = DPG_TIMEOUT,
+    ) -> bytes | None:
+        """Send a DPG command and return its payload, or None if rejected."""
+        await self.open()
+        loop = asyncio.get_running_loop()
+        pending = _Pending(command, loop.create_future())
+        self._pending.append(pending)
+        try:
+            if data:
+                await DPGService.DPG.write_command(self.client, command, data)
+            else:
+                await DPGService.DPG.write(self.client, dpg_read_frame(command))
+            return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+        except asyncio.TimeoutError:
+            pending.expires = loop.time() + timeout
+            self.logger.warning("DPG command %d timed out", command)
+            raise
+        except BaseException:
+            if pending in self._pending and not pending.future.done():
+                self._pending.remove(pending)
+            raise
+
+    def _handle_notification(self, sender, data: bytearray) -> None:
+        now = asyncio.get_running_loop().time()
+        while self._pending:
+            pending = self._pending.popleft()
+            if pending.future.done():
+                continue
+            if pending.expires < now:
+                pending.future.cancel()
+                continue
+            if pending.expires != float("inf"):
+                self.logger.debug("Dropping late answer to DPG command %d", pending.command)
+                pending.future.cancel()
+                return
+            try:
+                pending.future.set_result(decode_dpg_response(data))
+            except ValueError as ex:
+                pending.future.set_exception(ex)
+            return
+        self.logger.debug("Unsolicited DPG notification: %s", data.hex())
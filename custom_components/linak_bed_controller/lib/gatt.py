@@ -1,12 +1,13 @@
 """Low level helper classes to organise methods for interacting with the GATT services/characteristics provided by Linak Desks."""
 
-import asyncio
-import struct
-from typing import Optional, Tuple, Union
+from __future__ import annotations
 
-from bleak import BleakClient
+from typing import TYPE_CHECKING, Tuple, Union
 
-from .util import make_iter
+from . import codec
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
 
 
 class Characteristic:
@@ -54,6 +55,10 @@ class GenericAccessModelNumberCharacteristic(Characteristic):
     uuid = "00002A24-0000-1000-8000-00805F9B34FB"
 
 
+class GenericAccessFirmwareRevisionCharacteristic(Characteristic):
+    uuid = "00002A26-0000-1000-8000-00805F9B34FB"
+
+
 class GenericAccessService(Service):
     uuid = "00001800-0000-1000-8000-00805F9B34FB"
 
@@ -61,6 +66,7 @@ class GenericAccessService(Service):
     SERVICE_CHANGED = GenericAccessServiceChangedCharacteristic
     MANUFACTURER = GenericAccessManufacturerCharacteristic
     MODEL_NUMBER = GenericAccessModelNumberCharacteristic
+    FIRMWARE_REVISION = GenericAccessFirmwareRevisionCharacteristic
 
 
 # Reference Input
@@ -70,17 +76,19 @@ class ReferenceInputOneCharacteristic(Characteristic):
     uuid = "99fa0031-338a-1024-8a49-009c0215f78a"
 
 
+class ReferenceInputTwoCharacteristic(Characteristic):
+    uuid = "99fa0032-338a-1024-8a49-009c0215f78a"
+
+
 class ReferenceInputService(Service):
     uuid = "99fa0030-338a-1024-8a49-009c0215f78a"
 
     ONE = ReferenceInputOneCharacteristic
+    TWO = ReferenceInputTwoCharacteristic
 
     @classmethod
-    def encode_height(cls, height: Union[int, str]) -> bytearray:
-        try:
-            return bytearray(struct.pack("<H", int(height)))
-        except struct.error:
-            raise ValueError("Height must be an integer between 0 and 65535")
+    def encode_height(cls, height: Union[int, str]) -> bytes:
+        return codec.encode_position(height)
 
 
 # Reference Output
@@ -90,20 +98,26 @@ class ReferenceOutputOneCharacteristic(Characteristic):
     uuid = "99fa0021-338a-1024-8a49-009c0215f78a"
 
 
+class ReferenceOutputTwoCharacteristic(Characteristic):
+    uuid = "99fa0022-338a-1024-8a49-009c0215f78a"
+
+
 class ReferenceOutputService(Service):
     uuid = "99fa0020-338a-1024-8a49-009c0215f78a"
 
     ONE = ReferenceOutputOneCharacteristic
+    TWO = ReferenceOutputTwoCharacteristic
 
-    # @classmethod
-    # def decode_height_speed(cls, data: bytearray) -> Tuple[Height, Speed]:
-    #     height, speed = struct.unpack("<Hh", data)
-    #     return Height(height), Speed(speed)
+    @classmethod
+    def decode_position_speed(cls, data: bytearray) -> Tuple[int, int]:
+        return codec.decode_position_speed(data)
 
-    # @classmethod
-    # async def get_height_speed(cls, client: BleakClient) -> Tuple[Height, Speed]:
-    #     data = await cls.ONE.read(client)
-    #     return cls.decode_height_speed(data)
+    @classmethod
+    async def get_position_speed(
+        cls, client: BleakClient, characteristic: type[Characteristic]
+    ) -> Tuple[int, int]:
+        data = await characteristic.read(client)
+        return cls.decode_position_speed(data)
 
 
 # Control
@@ -119,7 +133,7 @@ class ControlCommandCharacteristic(Characteristic):
 
     @classmethod
     async def write_command(cls, client: BleakClient, command: int) -> None:
-        await client.write_gatt_char(cls.uuid, bytearray(struct.pack("BB", command, 0)))
+        await client.write_gatt_char(cls.uuid, codec.control_frame(command))
 
 
 class ControlErrorCharacteristic(Characteristic):
@@ -142,22 +156,21 @@ class DPGDPGCharacteristic(Characteristic):
     CMD_GET_CAPABILITIES = 128
     CMD_BASE_OFFSET = 129
     CMD_USER_ID = 134
+    CMD_MEMORY_POSITION_1 = 137
+    CMD_MEMORY_POSITION_2 = 138
+    CMD_MEMORY_POSITION_3 = 139
+    CMD_MEMORY_POSITION_4 = 140
 
     @classmethod
     async def read_command(cls, client: BleakClient, command: int) -> bytearray:
-        await cls.write(client, bytearray(struct.pack("BBB", 127, command, 0)))
+        await cls.write(client, codec.dpg_read_frame(command))
         return await client.read_gatt_char(cls.uuid)
 
     @classmethod
     async def write_command(
         cls, client: BleakClient, command: int, data: bytearray
     ) -> None:
-        header = struct.pack("BBB", 127, command, 128)
-        buffer = bytes()
-        for val in data:
-            buffer += struct.pack("B", val)
-        buffer = header + buffer
-        await cls.write(client, buffer)
+        await cls.write(client, codec.dpg_write_frame(command, data))
 
 
 class DPGService(Service):
@@ -167,26 +180,8 @@ class DPGService(Service):
 
     @classmethod
     def is_valid_response(self, response: bytearray) -> bool:
-        return response[0] == 0x1
+        return response[0] == codec.DPG_STATUS_OK
 
     @classmethod
     def is_valid_data(self, data: bytearray) -> bool:
         return data[1] > 0x1
-
-    @classmethod
-    async def dpg_command(
-        cls, client: BleakClient, command: int, data: Optional[bytearray] = None
-    ) -> bytearray:
-        iter, callback = make_iter()
-        await cls.DPG.subscribe(client, callback)
-        if data:
-            await cls.DPG.write_command(client, command, data)
-        else:
-            await cls.DPG.read_command(client, command)
-        async for sender, data in iter:
-            # Return the first response from the callback
-            await cls.DPG.unsubscribe(client)
-            if data[0] == 1:
-                return data[2:]
-            else:
-                return None
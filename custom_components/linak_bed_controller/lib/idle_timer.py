@@ -0,0 +1,42 @@
+"""Idle disconnect timer for a bed connection.
+
+Activity only moves a deadline forward. A single ``loop.call_later`` handle is
+armed at a time; when it fires before the deadline it re-arms itself for the
+remainder, so frequent use costs a float assignment rather than a task or a
+lock acquisition per command.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+
+class IdleTimer:
+    """Call ``on_idle`` once nothing has touched the timer for ``timeout`` seconds."""
+
+    def __init__(self, timeout: float, on_idle: Callable[[], None]) -> None:
+        self.timeout = timeout
+        self.on_idle = on_idle
+        self._deadline = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+
+    def touch(self) -> None:
+        """Push the deadline forward, arming the timer if it is not running."""
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.time() + self.timeout
+        if self._handle is None:
+            self._handle = loop.call_at(self._deadline, self._fire)
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _fire(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop.time() < self._deadline:
+            self._handle = loop.call_at(self._deadline, self._fire)
+            return
+        self._handle = None
+        self.on_idle()
@@ -0,0 +1,67 @@
+"""Latest-target-wins mailbox for actuator moves.
+
+Dragging a slider produces a burst of targets. Only the newest one matters, so
+targets are overwritten in place and the running move reads whatever is in the
+mailbox when it decides whether it is done.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+
+class TargetMailbox:
+    """Hold the latest requested position for one actuator."""
+
+    def __init__(self, debounce: float) -> None:
+        self.debounce = debounce
+        self.target: float | None = None
+        self._changed = asyncio.Event()
+
+        # Statistics for the current and previous move sessions
+        self.posted = 0
+        self.coalesced = 0
+        self.start: float | None = None
+        self.requested_travel = 0.0
+        self.total_coalesced = 0
+        self.total_commands_saved = 0
+
+    def post(self, target: float, position: float) -> None:
+        """Replace the target, dropping any not yet reached."""
+        if self.posted:
+            previous = self.target
+            self.coalesced += 1
+        else:
+            previous = self.start = position
+        self.requested_travel += abs(target - previous)
+        self.posted += 1
+        self.target = target
+        self._changed.set()
+
+    async def settle(self) -> float | None:
+        """Wait until no new target has arrived for ``debounce`` seconds."""
+        while True:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.debounce)
+            except asyncio.TimeoutError:
+                return self.target
+
+    def finish(self, commands_per_percent: float) -> int:
+        """Close the session and return how many commands coalescing saved.
+
+        Only dropped targets save anything: executing every posted target in
+        turn would have travelled to and back from each of them, on top of
+        the direct travel to the final target.
+        """
+        saved = 0
+        if self.coalesced and self.start is not None:
+            detour = self.requested_travel - abs(self.target - self.start)
+            saved = max(0, round(detour * commands_per_percent))
+        self.total_coalesced += self.coalesced
+        self.total_commands_saved += saved
+        self.posted = 0
+        self.coalesced = 0
+        self.start = None
+        self.requested_travel = 0.0
+        return saved
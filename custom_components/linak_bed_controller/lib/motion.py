@@ -0,0 +1,108 @@
+"""Streaming motion engine for Linak actuators.
+
+The control box keeps an actuator running for a short hold window after each
+move command. Instead of writing with response and sleeping between steps, the
+engine writes without response on a fixed cadence below that window, bounds the
+number of writes that may be outstanding at once and finishes with an explicit
+``STOP_MOVEMENT``. All writes go through the bed's ``CommandWriter``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable
+
+from .writer import CommandWriter
+
+
+class MotionStream:
+    """Keep an actuator moving by streaming one command at a steady cadence."""
+
+    def __init__(
+        self,
+        writer: CommandWriter,
+        command: bytes,
+        interval: float,
+        max_in_flight: int,
+        logger: logging.Logger,
+    ) -> None:
+        self.writer = writer
+        self.command = command
+        self.interval = interval
+        self.logger = logger
+        self.writes = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight: set[asyncio.Task] = set()
+        self._cancelled = asyncio.Event()
+        self._error: BaseException | None = None
+
+    def cancel(self) -> None:
+        """Stop streaming at the next opportunity."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    async def run(
+        self,
+        reached: Callable[[float], bool],
+        eta: Callable[[float], float] | None = None,
+    ) -> float:
+        """Stream until ``reached(elapsed)`` is true or the stream is cancelled.
+
+        ``eta(elapsed)`` may predict the seconds left until the target, so the
+        stream wakes up on arrival rather than at the next tick.
+
+        Returns the number of seconds the actuator was commanded to move.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        next_tick = start
+        try:
+            while not self.cancelled and not reached(loop.time() - start):
+                await self._slots.acquire()
+                if self.cancelled:
+                    self._slots.release()
+                    break
+                task = loop.create_task(self._send())
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+                # Never burst to catch up after flow control held us back
+                next_tick = max(next_tick + self.interval, loop.time())
+                wake = next_tick
+                if eta is not None:
+                    wake = min(wake, loop.time() + max(0, eta(loop.time() - start)))
+                try:
+                    await asyncio.wait_for(self._cancelled.wait(), wake - loop.time())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            elapsed = loop.time() - start
+            await self._finish()
+        if self._error is not None:
+            raise self._error
+        self.logger.debug(
+            "Streamed %d x %s in %.2fs", self.writes, self.command.hex(), elapsed
+        )
+        return elapsed
+
+    async def _send(self) -> None:
+        try:
+            if await self.writer.write(self.command):
+                self.writes += 1
+        except Exception as ex:  # noqa: BLE001
+            self.logger.warning("Streamed command write failed: %s", ex)
+            self._error = ex
+            self._cancelled.set()
+        finally:
+            self._slots.release()
+
+    async def _finish(self) -> None:
+        # STOP preempts whatever is still queued, so it is not delayed by it
+        if self.writer.client.is_connected:
+            await self.writer.finish()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
@@ -0,0 +1,108 @@
+"""Learned command pacing per bed and Bluetooth proxy.
+
+How fast step commands can be written depends on the path to the bed: a local
+adapter keeps up with a much shorter interval than a busy ESP32 proxy. Each
+``Pacing`` runs an AIMD loop over the interval between streamed commands. A
+window of clean writes shrinks it by a fixed step. A failed write, a timeout,
+or a write that takes longer than the interval itself grows it by a factor.
+The interval ranges from the motion cadence, below which faster writes gain
+nothing, to the control box's hold window, so the actuator keeps moving
+without gaps. A slow link therefore slows the cadence down, and the interval
+recovers once the link keeps up again.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from .const import (
+    MOTION_COMMAND_INTERVAL,
+    PACING_BACKOFF,
+    PACING_DECREASE,
+    PACING_MAX_INTERVAL,
+    PACING_MIN_INTERVAL,
+    PACING_WINDOW,
+)
+
+_LATENCY_SMOOTHING = 0.2
+
+
+class Pacing:
+    """AIMD controller for the interval between streamed commands."""
+
+    def __init__(
+        self,
+        interval: float = MOTION_COMMAND_INTERVAL,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        self.interval = min(PACING_MAX_INTERVAL, max(PACING_MIN_INTERVAL, interval))
+        self.latency: float | None = None  # smoothed write latency
+        self.writes = 0
+        self.failures = 0
+        self.on_change = on_change
+        self._streak = 0
+
+    def cadence(self, desired: float) -> float:
+        """Interval to stream at when the motion itself wants ``desired``."""
+        return min(PACING_MAX_INTERVAL, max(self.interval, desired))
+
+    def record_write(self, latency: float) -> None:
+        """Feed back how long a successful write took."""
+        self.writes += 1
+        self.latency = (
+            latency
+            if self.latency is None
+            else self.latency + _LATENCY_SMOOTHING * (latency - self.latency)
+        )
+        if latency > self.interval:
+            # The link is queueing writes, so the cadence is too fast for it
+            self.record_failure()
+            return
+        self._streak += 1
+        if self._streak >= PACING_WINDOW:
+            self._streak = 0
+            self._set(self.interval - PACING_DECREASE)
+
+    def record_failure(self) -> None:
+        """Back off after a write error or timeout."""
+        self.failures += 1
+        self._streak = 0
+        self._set(self.interval * PACING_BACKOFF)
+
+    def _set(self, interval: float) -> None:
+        floor = max(PACING_MIN_INTERVAL, self.latency or 0)
+        interval = round(min(PACING_MAX_INTERVAL, max(floor, interval)), 3)
+        if interval != self.interval:
+            self.interval = interval
+            if self.on_change is not None:
+                self.on_change()
+
+
+class PacingTable:
+    """Learned intervals keyed by bed address and connection source."""
+
+    def __init__(self, on_change: Callable[[], None] | None = None) -> None:
+        self._pacing: dict[str, Pacing] = {}
+        self._stored: dict[str, float] = {}
+        self.on_change = on_change
+
+    def load(self, data: dict[str, float]) -> None:
+        self._stored.update(data)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            **self._stored,
+            **{key: pacing.interval for key, pacing in self._pacing.items()},
+        }
+
+    def get(self, address: str, source: str) -> Pacing:
+        key = f"{address.upper()}@{source}"
+        if (pacing := self._pacing.get(key)) is None:
+            pacing = self._pacing[key] = Pacing(
+                self._stored.get(key, MOTION_COMMAND_INTERVAL), self._changed
+            )
+        return pacing
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
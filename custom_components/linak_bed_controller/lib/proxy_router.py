@@ -0,0 +1,144 @@
+"""Choose the adapter or proxy to reach a bed through.
+
+With several proxies in range, the BLEDevice Home Assistant hands out is the
+one with the best recent advertisement, which is not always the path that
+connects fastest. ``ProxyRouter`` keeps a connect history per bed and path and
+ranks candidates by expected time to first command: the smoothed time a
+successful connect takes, plus a connect timeout for every failure expected
+before it. Paths without history are estimated from their RSSI.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Iterable
+
+from .const import (
+    CONNECTION_TIMEOUT,
+    PROXY_HISTORY,
+    PROXY_LATENCY_PRIOR,
+    PROXY_RSSI_PENALTY,
+    PROXY_RSSI_REFERENCE,
+)
+
+_LATENCY_SMOOTHING = 0.3
+
+
+@dataclass(frozen=True)
+class RoutePath:
+    """One way to reach a bed: a BLEDevice heard through an adapter or proxy."""
+
+    source: str
+    rssi: int | None
+    device: Any
+
+
+class PathStats:
+    """Connect history of one bed through one path."""
+
+    def __init__(
+        self, latency: float | None = None, outcomes: Iterable[bool] = ()
+    ) -> None:
+        self.latency = latency  # smoothed seconds to first command
+        self.outcomes: deque[bool] = deque(outcomes, maxlen=PROXY_HISTORY)
+
+    @property
+    def success_rate(self) -> float:
+        """Recent success rate, pulled towards one half while history is short."""
+        return (sum(self.outcomes) + 1) / (len(self.outcomes) + 2)
+
+    def record(self, latency: float | None) -> None:
+        """Add an outcome; ``latency`` is None for a failed connect."""
+        self.outcomes.append(latency is not None)
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + _LATENCY_SMOOTHING * (latency - self.latency)
+            )
+
+    def expected(self, rssi: int | None) -> float:
+        """Expected seconds to first command through this path."""
+        latency = self.latency
+        if latency is None:
+            latency = PROXY_LATENCY_PRIOR
+            if rssi is not None:
+                latency += max(0, PROXY_RSSI_REFERENCE - rssi) * PROXY_RSSI_PENALTY
+        rate = self.success_rate
+        return latency + (1 - rate) / rate * CONNECTION_TIMEOUT
+
+
+class ProxyRouter:
+    """Connect histories keyed by bed address and connection source."""
+
+    def __init__(self, on_change: Callable[[], None] | None = None) -> None:
+        self._stats: dict[str, PathStats] = {}
+        self.on_change = on_change
+
+    def load(self, data: dict[str, dict[str, Any]]) -> None:
+        """Merge stored histories without overriding fresh ones."""
+        for key, stats in data.items():
+            self._stats.setdefault(
+                key, PathStats(stats.get("latency"), stats.get("outcomes", ()))
+            )
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        return {
+            key: {"latency": stats.latency, "outcomes": list(stats.outcomes)}
+            for key, stats in self._stats.items()
+        }
+
+    def stats(self, address: str, source: str) -> PathStats:
+        key = f"{address.upper()}@{source}"
+        if (stats := self._stats.get(key)) is None:
+            stats = self._stats[key] = PathStats()
+        return stats
+
+    def rank(self, address: str, paths: Iterable[RoutePath]) -> list[RoutePath]:
+        """Order paths from the lowest expected time to first command."""
+        return sorted(
+            paths, key=lambda path: self.stats(address, path.source).expected(path.rssi)
+        )
+
+    def choose(
+        self,
+        address: str,
+        paths: Iterable[RoutePath],
+        exclude: Collection[str] = (),
+    ) -> RoutePath | None:
+        """Return the best path, skipping sources that already failed.
+
+        When every path has failed the best one is tried again.
+        """
+        ranked = self.rank(address, paths)
+        for path in ranked:
+            if path.source not in exclude:
+                return path
+        return ranked[0] if ranked else None
+
+    def record(self, address: str, source: str, latency: float | None) -> None:
+        """Record a connect through source; ``latency`` is None if it failed."""
+        self.stats(address, source).record(latency)
+        if self.on_change is not None:
+            self.on_change()
+
+    def describe(
+        self, address: str, paths: Iterable[RoutePath] = ()
+    ) -> dict[str, dict[str, Any]]:
+        """Known and candidate paths to a bed, for diagnostics."""
+        rssi = {path.source: path.rssi for path in paths}
+        prefix = f"{address.upper()}@"
+        sources = {
+            key.removeprefix(prefix) for key in self._stats if key.startswith(prefix)
+        } | rssi.keys()
+        described = {}
+        for source in sources:
+            stats = self.stats(address, source)
+            described[source] = {
+                "rssi": rssi.get(source),
+                "expected": round(stats.expected(rssi.get(source)), 2),
+                "latency": None if stats.latency is None else round(stats.latency, 2),
+                "success_rate": round(stats.success_rate, 2),
+            }
+        return dict(sorted(described.items(), key=lambda item: item[1]["expected"]))
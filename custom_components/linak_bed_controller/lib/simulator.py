@@ -0,0 +1,427 @@
+"""Simulated Linak bed peripheral with a BleakClient compatible interface.
+
+Used to benchmark and regression test the movement code in ``bed.py`` without a
+radio. The model is deliberately simple: every move command keeps the addressed
+actuator(s) running for ``hold_time`` seconds at a constant speed, which is how
+the Linak control box behaves while a remote button is held down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import time
+from typing import Any, Callable
+
+from .const import REFERENCE_POSITION_MAX
+from . import codec, gatt
+
+# Raw command byte -> (head direction, foot direction)
+_MOVES: dict[int, tuple[int, int]] = {
+    0x00: (-1, -1),  # ALL_DOWN
+    0x01: (1, 1),  # ALL_UP
+    0x0B: (1, 0),  # HEAD_UP
+    0x0A: (-1, 0),  # HEAD_DOWN
+    0x09: (0, 1),  # FOOT_UP
+    0x08: (0, -1),  # FOOT_DOWN
+}
+_STOP = 0xFF
+_WAKEUP = 0xFE
+
+
+@dataclass
+class SimulatedActuator:
+    """A single actuator driven at constant speed."""
+
+    name: str
+    stroke_time: float  # seconds for a full stroke
+    max_position: int = REFERENCE_POSITION_MAX
+    position: int = 0
+    direction: int = 0
+    _run_until: float = 0.0
+    _last_update: float = 0.0
+    _exact: float = 0.0
+    target: int | None = None  # ReferenceInput target, if any
+
+    def __post_init__(self) -> None:
+        self._exact = float(self.position)
+        self._last_update = time.monotonic()
+
+    @property
+    def speed(self) -> float:
+        """Raw position units per second."""
+        return self.max_position / self.stroke_time
+
+    @property
+    def percentage(self) -> float:
+        return round(100 * self.position / self.max_position, 2)
+
+    def set_percentage(self, percentage: float) -> None:
+        self._exact = self.max_position * percentage / 100
+        self.position = int(round(self._exact))
+
+    def advance(self, now: float) -> None:
+        """Integrate the position up to ``now``."""
+        if self.direction:
+            end = min(now, self._run_until)
+            if end > self._last_update:
+                self._exact += self.direction * self.speed * (end - self._last_update)
+                self._exact = min(max(self._exact, 0.0), float(self.max_position))
+                if self.target is not None and (
+                    (self.target - self._exact) * self.direction <= 0
+                ):
+                    self._exact = float(self.target)
+                    self._run_until = now
+                self.position = int(round(self._exact))
+            if now >= self._run_until or self._exact in (0.0, self.max_position):
+                self.direction = 0
+                self.target = None
+        self._last_update = now
+
+    def run(self, direction: int, now: float, hold_time: float) -> None:
+        self.advance(now)
+        self.direction = direction
+        self._run_until = now + hold_time
+        self.target = None
+
+    def run_to(self, target: int, now: float) -> None:
+        """Drive to an absolute ReferenceInput position without keep-alives."""
+        self.advance(now)
+        if target == self.position:
+            return
+        self.direction = 1 if target > self.position else -1
+        self._run_until = float("inf")
+        self.target = min(max(target, 0), self.max_position)
+
+    def stop(self, now: float) -> None:
+        self.advance(now)
+        self.direction = 0
+        self.target = None
+
+    def encode(self) -> bytes:
+        speed = int(self.direction * self.speed) if self.direction else 0
+        return codec.POSITION_SPEED.pack(self.position, max(-32768, min(32767, speed)))
+
+
+@dataclass
+class SimulatedBedDevice:
+    """The peripheral side of a simulated bed, usable in place of a BLEDevice."""
+
+    address: str = "00:00:00:00:00:00"
+    name: str = "Simulated Linak Bed"
+    head_stroke_time: float = 26.0
+    foot_stroke_time: float = 19.0
+    hold_time: float = 0.5
+    write_latency: float = 0.01
+    ack_latency: float = 0.03
+    connect_latency: float = 0.5
+    notify_interval: float = 0.1
+    # Airtime each write occupies; writes queue for the link in order
+    link_interval: float = 0.0
+    model_number: bytes = b"CB20"
+    firmware_revision: bytes = b"1.0"
+    dpg_responses: dict[int, bytes] = field(
+        default_factory=lambda: {
+            gatt.DPGDPGCharacteristic.CMD_GET_CAPABILITIES: bytes([0x0B, 0x01]),
+            gatt.DPGDPGCharacteristic.CMD_BASE_OFFSET: codec.encode_position(0),
+            gatt.DPGDPGCharacteristic.CMD_USER_ID: bytes(16),
+        }
+    )
+    rssi: int = -60
+    details: dict[str, Any] = field(default_factory=lambda: {"source": "simulator"})
+
+    def __post_init__(self) -> None:
+        self.head = SimulatedActuator("head", self.head_stroke_time)
+        self.foot = SimulatedActuator("foot", self.foot_stroke_time)
+        self.writes: list[tuple[float, str, bytes]] = []
+        self.connects = 0
+        self.halted_at: float | None = None
+        self._dpg_last = bytearray()
+        self._clients: list[SimulatedBleakClient] = []
+        self._link = asyncio.Lock()
+
+    @property
+    def actuators(self) -> tuple[SimulatedActuator, SimulatedActuator]:
+        return self.head, self.foot
+
+    @property
+    def is_moving(self) -> bool:
+        now = time.monotonic()
+        for actuator in self.actuators:
+            actuator.advance(now)
+        return any(actuator.direction for actuator in self.actuators)
+
+    def reset_stats(self) -> None:
+        self.writes.clear()
+        self.connects = 0
+        self.halted_at = None
+
+    async def transmit(self) -> None:
+        """Wait for the link to be free and occupy it for one write.
+
+        A write that is cancelled while it waits never goes out.
+        """
+        if not self.link_interval:
+            return
+        await self._link.acquire()
+        asyncio.get_running_loop().call_later(self.link_interval, self._link.release)
+
+    def command_count(self, uuid: str = gatt.ControlCommandCharacteristic.uuid) -> int:
+        return sum(1 for _, written, _ in self.writes if written == uuid)
+
+    def handle_write(self, uuid: str, data: bytes) -> None:
+        now = time.monotonic()
+        self.writes.append((now, uuid, data))
+        if uuid == gatt.ControlCommandCharacteristic.uuid:
+            self._handle_command(data[0], now)
+        elif uuid == gatt.DPGDPGCharacteristic.uuid:
+            self._handle_dpg(data)
+        else:
+            for actuator, char in zip(self.actuators, _REFERENCE_INPUTS):
+                if uuid == char.uuid:
+                    actuator.run_to(codec.POSITION.unpack_from(data)[0], now)
+                    self._notify_positions()
+
+    def read(self, uuid: str) -> bytearray:
+        now = time.monotonic()
+        if uuid == gatt.GenericAccessModelNumberCharacteristic.uuid.lower():
+            return bytearray(self.model_number)
+        if uuid == gatt.GenericAccessFirmwareRevisionCharacteristic.uuid.lower():
+            return bytearray(self.firmware_revision)
+        if uuid == gatt.GenericAccessDeviceNameCharacteristic.uuid.lower():
+            return bytearray(self.name.encode())
+        if uuid == gatt.DPGDPGCharacteristic.uuid:
+            return bytearray(self._dpg_last)
+        for actuator, char in zip(self.actuators, _REFERENCE_OUTPUTS):
+            if uuid == char.uuid:
+                actuator.advance(now)
+                return bytearray(actuator.encode())
+        return bytearray()
+
+    def _handle_command(self, command: int, now: float) -> None:
+        if command == _STOP:
+            for actuator in self.actuators:
+                actuator.stop(now)
+            self.halted_at = now
+        elif command in _MOVES:
+            for actuator, direction in zip(self.actuators, _MOVES[command]):
+                if direction:
+                    actuator.run(direction, now, self.hold_time)
+        self._notify_positions()
+
+    def _handle_dpg(self, data: bytes) -> None:
+        command = data[1]
+        if data[2] == 0:
+            payload = self.dpg_responses.get(command, b"")
+        else:
+            self.dpg_responses[command] = bytes(data[3:])
+            payload = b""
+        self._dpg_last = bytearray([0x01, len(payload)]) + payload
+        self._notify(gatt.DPGDPGCharacteristic.uuid, self._dpg_last)
+
+    def change_services(self) -> None:
+        """Indicate Service Changed for the whole handle range."""
+        self._notify(
+            gatt.GenericAccessServiceChangedCharacteristic.uuid.lower(),
+            bytearray([0x01, 0x00, 0xFF, 0xFF]),
+        )
+
+    def _notify_positions(self) -> None:
+        for actuator, char in zip(self.actuators, _REFERENCE_OUTPUTS):
+            self._notify(char.uuid, bytearray(actuator.encode()))
+
+    def _notify(self, uuid: str, data: bytearray) -> None:
+        for client in self._clients:
+            client._deliver(uuid, data)
+
+    async def run_notifier(self) -> None:
+        """Stream ReferenceOutput notifications while an actuator is moving."""
+        was_moving = False
+        while True:
+            moving = self.is_moving
+            if moving or was_moving:
+                self._notify_positions()
+            was_moving = moving
+            await asyncio.sleep(self.notify_interval)
+
+
+_REFERENCE_OUTPUTS = (
+    gatt.ReferenceOutputService.ONE,
+    gatt.ReferenceOutputService.TWO,
+)
+_REFERENCE_INPUTS = (
+    gatt.ReferenceInputService.ONE,
+    gatt.ReferenceInputService.TWO,
+)
+
+
+@dataclass(frozen=True)
+class SimulatedCharacteristic:
+    uuid: str
+    handle: int
+    properties: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SimulatedService:
+    uuid: str
+    handle: int
+    characteristics: tuple[SimulatedCharacteristic, ...]
+
+
+def _build_services() -> tuple[SimulatedService, ...]:
+    layout = (
+        (
+            gatt.GenericAccessService,
+            (
+                gatt.GenericAccessDeviceNameCharacteristic,
+                gatt.GenericAccessServiceChangedCharacteristic,
+                gatt.GenericAccessManufacturerCharacteristic,
+                gatt.GenericAccessModelNumberCharacteristic,
+                gatt.GenericAccessFirmwareRevisionCharacteristic,
+            ),
+        ),
+        (gatt.ControlService, (gatt.ControlService.COMMAND, gatt.ControlService.ERROR)),
+        (gatt.DPGService, (gatt.DPGService.DPG,)),
+        (gatt.ReferenceOutputService, _REFERENCE_OUTPUTS),
+        (gatt.ReferenceInputService, _REFERENCE_INPUTS),
+    )
+    services = []
+    handle = 1
+    for service, characteristics in layout:
+        service_handle = handle
+        chars = []
+        for char in characteristics:
+            handle += 2
+            chars.append(
+                SimulatedCharacteristic(
+                    char.uuid.lower(), handle, ("read", "write", "notify")
+                )
+            )
+        services.append(SimulatedService(service.uuid.lower(), service_handle, tuple(chars)))
+        handle += 1
+    return tuple(services)
+
+
+_SERVICES = _build_services()
+
+
+class SimulatedBleakClient:
+    """Client side of the simulator, mirroring the parts of BleakClient we use."""
+
+    def __init__(
+        self,
+        address_or_ble_device: SimulatedBedDevice,
+        disconnected_callback: Callable[[Any], None] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.device = address_or_ble_device
+        self.address = address_or_ble_device.address
+        self._disconnected_callback = disconnected_callback
+        self._connected = False
+        self._callbacks: dict[str, Callable[[Any, bytearray], None]] = {}
+        self._notifier: asyncio.Task | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def services(self) -> tuple[SimulatedService, ...]:
+        return _SERVICES
+
+    async def connect(self, **kwargs: Any) -> bool:
+        await asyncio.sleep(self.device.connect_latency)
+        self._connected = True
+        self.device.connects += 1
+        self.device._clients.append(self)
+        self._notifier = asyncio.create_task(self.device.run_notifier())
+        return True
+
+    async def disconnect(self) -> bool:
+        if not self._connected:
+            return True
+        self._connected = False
+        self._callbacks.clear()
+        if self in self.device._clients:
+            self.device._clients.remove(self)
+        if self._notifier is not None:
+            self._notifier.cancel()
+            self._notifier = None
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+        return True
+
+    async def write_gatt_char(
+        self, char_specifier: Any, data: bytes, response: bool | None = None
+    ) -> None:
+        uuid = self._check(char_specifier)
+        payload = bytes(data)
+        await self.device.transmit()
+        if response:
+            await asyncio.sleep(self.device.write_latency)
+            self.device.handle_write(uuid, payload)
+            await asyncio.sleep(self.device.ack_latency)
+        else:
+            asyncio.get_running_loop().call_later(
+                self.device.write_latency, self.device.handle_write, uuid, payload
+            )
+            await asyncio.sleep(0)
+
+    async def read_gatt_char(self, char_specifier: Any, **kwargs: Any) -> bytearray:
+        uuid = self._check(char_specifier)
+        await asyncio.sleep(self.device.write_latency + self.device.ack_latency)
+        return self.device.read(uuid)
+
+    async def start_notify(
+        self, char_specifier: Any, callback: Callable[[Any, bytearray], None], **kwargs: Any
+    ) -> None:
+        uuid = self._check(char_specifier)
+        await asyncio.sleep(self.device.write_latency + self.device.ack_latency)
+        self._callbacks[uuid] = callback
+
+    async def stop_notify(self, char_specifier: Any) -> None:
+        uuid = self._check(char_specifier)
+        self._callbacks.pop(uuid, None)
+
+    def _deliver(self, uuid: str, data: bytearray) -> None:
+        if (callback := self._callbacks.get(uuid)) is not None:
+            callback(self.get_characteristic(uuid), bytearray(data))
+
+    def get_characteristic(self, uuid: str) -> SimulatedCharacteristic | None:
+        for service in _SERVICES:
+            for char in service.characteristics:
+                if char.uuid == uuid:
+                    return char
+        return None
+
+    def _check(self, char_specifier: Any) -> str:
+        if not self._connected:
+            from bleak.exc import BleakError
+
+            raise BleakError("Not connected")
+        if isinstance(char_specifier, int):
+            for service in _SERVICES:
+                for char in service.characteristics:
+                    if char.handle == char_specifier:
+                        return char.uuid
+        if hasattr(char_specifier, "uuid"):
+            return char_specifier.uuid.lower()
+        return str(char_specifier).lower()
+
+
+async def establish_connection(
+    client_class: type,
+    device: SimulatedBedDevice,
+    name: str,
+    disconnected_callback: Callable[[Any], None] | None = None,
+    max_attempts: int = 3,
+    ble_device_callback: Callable[[], SimulatedBedDevice] | None = None,
+    **kwargs: Any,
+) -> SimulatedBleakClient:
+    """Drop-in replacement for ``bleak_retry_connector.establish_connection``."""
+    if ble_device_callback is not None:
+        device = ble_device_callback() or device
+    client = SimulatedBleakClient(device, disconnected_callback=disconnected_callback)
+    await client.connect()
+    return client
@@ -1,17 +1,65 @@
 """Random helpers and util."""
 
+from __future__ import annotations
+
 import asyncio
+from collections import deque
+import threading
+from typing import AsyncIterator
+
+NOTIFICATION_BUFFER_SIZE = 64
+
+
+class NotificationBuffer:
+    """Bounded ring buffer for the notifications of one characteristic.
+
+    When consumers fall behind, the oldest packets are dropped. Packets are
+    kept as memoryviews of the buffers bleak hands us, so decoders can
+    ``unpack_from`` them without copying. Consumers take everything that has
+    arrived in one batch.
+    """
+
+    def __init__(self, maxlen: int = NOTIFICATION_BUFFER_SIZE) -> None:
+        self._buffer: deque[memoryview] = deque(maxlen=maxlen)
+        self._ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
 
+    @property
+    def closed(self) -> bool:
+        return self._closed
 
-def make_iter():
-    loop = asyncio.get_event_loop()
-    queue = asyncio.Queue()
+    def put(self, sender, data: bytearray) -> None:
+        """Notification callback, safe to call from any thread."""
+        if threading.get_ident() != self._thread_id:
+            self._loop.call_soon_threadsafe(self.put, sender, data)
+            return
+        if self._closed:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(memoryview(data))
+        self.received += 1
+        self._ready.set()
 
-    def put(*args):
-        loop.call_soon_threadsafe(queue.put_nowait, args)
+    async def get_batch(self) -> list[memoryview]:
+        """Wait for packets and return all of them; empty once closed."""
+        while not self._buffer and not self._closed:
+            self._ready.clear()
+            await self._ready.wait()
+        batch = list(self._buffer)
+        self._buffer.clear()
+        return batch
 
-    async def get():
-        while True:
-            yield await queue.get()
+    async def batches(self) -> AsyncIterator[list[memoryview]]:
+        while batch := await self.get_batch():
+            yield batch
 
-    return get(), put
+    def close(self) -> None:
+        """Release waiting consumers and drop anything still buffered."""
+        self._closed = True
+        self._buffer.clear()
+        self._ready.set()
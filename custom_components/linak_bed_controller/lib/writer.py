@@ -0,0 +1,179 @@
+"""Single writer for the control command characteristic.
+
+Every frame for a bed's command characteristic goes through one task, so
+writes reach the radio in order and never overlap. Step commands queue in a
+normal lane. ``STOP_MOVEMENT`` has its own lane that jumps the queue: requesting
+a stop drops every queued step, cancels the step being written and makes STOP
+the very next write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+from typing import TYPE_CHECKING
+
+from .codec import Command
+from .pacing import Pacing
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
+
+STOP_TIMEOUT = 2.0  # seconds
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandWriter:
+    """Serialise command writes for one connection, with a priority STOP lane."""
+
+    def __init__(
+        self,
+        client: BleakClient,
+        characteristic: str | int,
+        logger: logging.Logger = _LOGGER,
+        pacing: Pacing | None = None,
+    ) -> None:
+        self.client = client
+        self.characteristic = characteristic
+        self.logger = logger
+        self.pacing = pacing if pacing is not None else Pacing()
+        self.moving = False  # A step was written since the last STOP
+        self.writes = 0
+        self.stops = 0
+        self.preempted = 0
+        self.last_stop_latency: float | None = None
+        self._steps: deque[tuple[bytes, asyncio.Future]] = deque()
+        self._stop: asyncio.Future | None = None
+        self._stop_requested = 0.0
+        self._current: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def write(self, command: bytes) -> bool:
+        """Queue a step command and wait until it has been written.
+
+        Returns False when a stop preempted the command before it went out.
+        Write errors are raised to the caller.
+        """
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._steps.append((command, future))
+        self._wakeup.set()
+        return await future
+
+    def stop(self) -> asyncio.Future:
+        """Preempt all step commands and write STOP_MOVEMENT next.
+
+        The future resolves to True once STOP has been acknowledged, or to False
+        if it could not be written. Stops requested while one is pending share
+        its future.
+        """
+        self._ensure_running()
+        if self._stop is None:
+            loop = asyncio.get_running_loop()
+            self._stop = loop.create_future()
+            self._stop_requested = loop.time()
+            while self._steps:
+                _, future = self._steps.popleft()
+                if not future.done():
+                    future.set_result(False)
+                    self.preempted += 1
+            if self._current is not None:
+                self._current.cancel()
+            self._wakeup.set()
+        return self._stop
+
+    async def finish(self) -> bool:
+        """Stop the actuators unless a stop already went out after the last step."""
+        if self.moving or self._stop is not None:
+            return await self.stop()
+        return True
+
+    async def close(self) -> None:
+        """Cancel the writer and release every waiter."""
+        if self._current is not None:
+            self._current.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._steps:
+            _, future = self._steps.popleft()
+            if not future.done():
+                future.set_result(False)
+        if self._stop is not None and not self._stop.done():
+            self._stop.set_result(False)
+        self._stop = None
+
+    async def _run(self) -> None:
+        while True:
+            if self._stop is not None:
+                await self._write_stop()
+            elif self._steps:
+                await self._write_step(*self._steps.popleft())
+            else:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+    async def _write_step(self, command: bytes, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self._current = asyncio.ensure_future(
+            self.client.write_gatt_char(self.characteristic, command, response=False)
+        )
+        try:
+            # wait() rather than await, so a preempted write does not look
+            # like the writer itself being cancelled
+            await asyncio.wait((self._current,))
+        finally:
+            current, self._current = self._current, None
+        if future.done():
+            return
+        if current.cancelled():
+            self.preempted += 1
+            future.set_result(False)
+        elif (error := current.exception()) is not None:
+            self.pacing.record_failure()
+            future.set_exception(error)
+        else:
+            self.pacing.record_write(loop.time() - started)
+            self.writes += 1
+            self.moving = True
+            future.set_result(True)
+
+    async def _write_stop(self) -> None:
+        stop = self._stop
+        try:
+            await asyncio.wait_for(
+                self.client.write_gatt_char(
+                    self.characteristic, Command.STOP_MOVEMENT, response=True
+                ),
+                timeout=STOP_TIMEOUT,
+            )
+        except Exception as ex:  # noqa: BLE001
+            self.logger.warning("Failed to send stop command: %s", ex)
+            self.pacing.record_failure()
+            if not stop.done():
+                stop.set_result(False)
+        else:
+            self.stops += 1
+            self.moving = False
+            self.last_stop_latency = (
+                asyncio.get_running_loop().time() - self._stop_requested
+            )
+            if not stop.done():
+                stop.set_result(True)
+        finally:
+            if self._stop is stop:
+                self._stop = None
@@ -0,0 +1,8 @@
+"""Make the standalone bed library importable as ``lib``."""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(
+    0, str(Path(__file__).parents[1] / "custom_components" / "linak_bed_controller")
+)
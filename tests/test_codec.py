@@ -0,0 +1,93 @@
+"""Tests for the Linak frame codec."""
+
+import pytest
+
+from lib import codec
+from lib.codec import Command
+
+
+@pytest.mark.parametrize("command", list(Command))
+def test_control_frame_matches_command(command: Command) -> None:
+    assert codec.control_frame(command[0]) == command
+
+
+def test_dpg_frames() -> None:
+    assert codec.dpg_read_frame(0x80) == b"\x7f\x80\x00"
+    assert codec.dpg_write_frame(0x86, [1, 2, 3]) == b"\x7f\x86\x80\x01\x02\x03"
+    assert codec.dpg_write_frame(0x86, b"") == b"\x7f\x86\x80"
+
+
+@pytest.mark.parametrize("frame", [codec.control_frame, codec.dpg_read_frame])
+@pytest.mark.parametrize("command", [-1, 256])
+def test_frame_rejects_command_out_of_range(frame, command: int) -> None:
+    with pytest.raises(ValueError):
+        frame(command)
+
+
+def test_dpg_response() -> None:
+    assert codec.decode_dpg_response(b"\x01\x02\xab\xcd") == b"\xab\xcd"
+    assert codec.decode_dpg_response(memoryview(b"\x01\x00")) == b""
+    assert codec.decode_dpg_response(b"\x02\x02\xab\xcd") is None
+
+
+@pytest.mark.parametrize("data", [b"", b"\x01"])
+def test_dpg_response_rejects_truncated_frame(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        codec.decode_dpg_response(data)
+
+
+@pytest.mark.parametrize("position", [0, 1, 5000, 0xFFFF, "1234"])
+def test_position_round_trip(position) -> None:
+    encoded = codec.encode_position(position)
+    assert len(encoded) == 2
+    assert codec.decode_position(encoded) == int(position)
+    assert codec.decode_position(memoryview(bytearray(encoded))) == int(position)
+
+
+@pytest.mark.parametrize("position", [-1, 0x10000, "up"])
+def test_encode_position_rejects_invalid(position) -> None:
+    with pytest.raises(ValueError):
+        codec.encode_position(position)
+
+
+def test_decode_position_rejects_short_value() -> None:
+    with pytest.raises(ValueError):
+        codec.decode_position(b"\x01")
+
+
+@pytest.mark.parametrize("record", [(0, 0), (10000, 42), (1234, -56), (0xFFFF, -1)])
+def test_position_speed_round_trip(record: tuple[int, int]) -> None:
+    data = codec.POSITION_SPEED.pack(*record)
+    assert codec.decode_position_speed(data) == record
+    assert codec.decode_position_speed(memoryview(data)) == record
+
+
+@pytest.mark.parametrize("data", [b"", b"\x01\x02\x03"])
+def test_decode_position_speed_rejects_short_value(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        codec.decode_position_speed(data)
+
+
+def test_iter_position_speed_batch() -> None:
+    records = [(position, position % 7 - 3) for position in range(0, 10000, 250)]
+    packets = [memoryview(codec.POSITION_SPEED.pack(*record)) for record in records]
+    assert list(codec.iter_position_speed(packets)) == records
+    assert list(codec.iter_position_speed([])) == []
+
+
+def test_iter_position_speed_packet_with_several_records() -> None:
+    packet = codec.POSITION_SPEED.pack(1, 2) + codec.POSITION_SPEED.pack(3, -4)
+    assert list(codec.iter_position_speed([packet])) == [(1, 2), (3, -4)]
+
+
+@pytest.mark.parametrize(
+    "packets",
+    [
+        [b"\x01\x00\x02\x00", b"\x01\x00"],
+        [b"\x01\x00\x02\x00\x03"],
+        [b"\x01"],
+    ],
+)
+def test_iter_position_speed_rejects_partial_record(packets: list[bytes]) -> None:
+    with pytest.raises(ValueError):
+        codec.iter_position_speed(packets)
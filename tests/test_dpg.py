@@ -0,0 +1,100 @@
+"""Tests for matching DPG answers to requests."""
+
+import asyncio
+
+import pytest
+
+from lib import codec
+from lib.dpg import DPGChannel
+
+
+class FakeClient:
+    """Records DPG writes and lets the test deliver the notifications."""
+
+    is_connected = True
+
+    def __init__(self) -> None:
+        self.writes: list[bytes] = []
+        self.callback = None
+
+    async def start_notify(self, uuid, callback) -> None:
+        self.callback = callback
+
+    async def stop_notify(self, uuid) -> None:
+        self.callback = None
+
+    async def write_gatt_char(self, uuid, value) -> None:
+        self.writes.append(bytes(value))
+
+    def answer(self, payload: bytes) -> None:
+        self.callback(None, bytearray([codec.DPG_STATUS_OK, len(payload), *payload]))
+
+
+async def _written(client: FakeClient, count: int) -> None:
+    while len(client.writes) < count:
+        await asyncio.sleep(0)
+
+
+def test_answers_in_order() -> None:
+    async def run() -> None:
+        client = FakeClient()
+        channel = DPGChannel(client)
+        first = asyncio.create_task(channel.request(0x80))
+        second = asyncio.create_task(channel.request(0x86))
+        await _written(client, 2)
+        assert client.writes == [codec.dpg_read_frame(0x80), codec.dpg_read_frame(0x86)]
+        client.answer(b"\x01")
+        client.answer(b"\x02\x03")
+        assert await first == b"\x01"
+        assert await second == b"\x02\x03"
+
+    asyncio.run(run())
+
+
+def test_late_answer_is_dropped() -> None:
+    async def run() -> None:
+        client = FakeClient()
+        channel = DPGChannel(client)
+        with pytest.raises(asyncio.TimeoutError):
+            await channel.request(0x80, timeout=0.05)
+        second = asyncio.create_task(channel.request(0x86))
+        await _written(client, 2)
+        # The answer to the timed out request must not reach the next one
+        client.answer(b"\x01")
+        await asyncio.sleep(0)
+        assert not second.done()
+        client.answer(b"\x02")
+        assert await second == b"\x02"
+
+    asyncio.run(run())
+
+
+def test_expired_request_is_skipped() -> None:
+    async def run() -> None:
+        client = FakeClient()
+        channel = DPGChannel(client)
+        with pytest.raises(asyncio.TimeoutError):
+            await channel.request(0x80, timeout=0.05)
+        # The control box never answered, so the request expires
+        await asyncio.sleep(0.1)
+        second = asyncio.create_task(channel.request(0x86))
+        await _written(client, 2)
+        client.answer(b"\x02")
+        assert await second == b"\x02"
+
+    asyncio.run(run())
+
+
+def test_close_fails_pending_requests() -> None:
+    async def run() -> None:
+        client = FakeClient()
+        channel = DPGChannel(client)
+        pending = asyncio.create_task(channel.request(0x80))
+        await _written(client, 1)
+        await channel.close()
+        with pytest.raises(ConnectionError):
+            await pending
+        assert not channel.is_open
+        assert client.callback is None
+
+    asyncio.run(run())
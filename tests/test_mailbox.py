@@ -0,0 +1,39 @@
+"""Tests for the coalescing statistics of the target mailbox."""
+
+from lib.mailbox import TargetMailbox
+
+
+def test_single_target_saves_nothing() -> None:
+    mailbox = TargetMailbox(0.1)
+    mailbox.post(50, 0)
+    assert mailbox.finish(2.0) == 0
+    assert mailbox.total_coalesced == 0
+    assert mailbox.total_commands_saved == 0
+
+
+def test_targets_on_the_way_save_nothing() -> None:
+    mailbox = TargetMailbox(0.1)
+    for target in range(10, 101, 10):
+        mailbox.post(target, 0)
+    assert mailbox.finish(2.0) == 0
+    assert mailbox.total_coalesced == 9
+
+
+def test_dropped_target_saves_the_detour() -> None:
+    mailbox = TargetMailbox(0.1)
+    mailbox.post(100, 0)
+    mailbox.post(30, 0)
+    # 0 -> 100 -> 30 instead of 0 -> 30, at two commands per percent
+    assert mailbox.finish(2.0) == 280
+    assert mailbox.total_commands_saved == 280
+
+
+def test_sessions_are_independent() -> None:
+    mailbox = TargetMailbox(0.1)
+    mailbox.post(100, 0)
+    mailbox.post(30, 0)
+    mailbox.finish(1.0)
+    mailbox.post(80, 30)
+    assert mailbox.finish(1.0) == 0
+    assert mailbox.total_coalesced == 1
+    assert mailbox.total_commands_saved == 140